@@ -3,9 +3,11 @@ Clone Hero .chart File Generator
 Converts MIDI notes to Clone Hero .chart format.
 """
 
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 import os
 
+import numpy as np
+
 
 class ChartGenerator:
     """Generates Clone Hero .chart files from MIDI note data."""
@@ -51,6 +53,9 @@ class ChartGenerator:
         "Easy": (60, 64),
     }
 
+    # Notes formatted per write() when streaming a chart to disk
+    WRITE_CHUNK_NOTES = 8192
+
     def __init__(self, resolution: int = 192):
         """
         Initialize chart generator.
@@ -60,6 +65,33 @@ class ChartGenerator:
         """
         self.resolution = resolution
 
+        # Chart being built through start_chart()/add_note()/write_chart()
+        self._song_name = ""
+        self._artist = ""
+        self._charter = "MIDI Chart Maker"
+        self._bpm = 120.0
+        self._reset_pending_notes()
+
+    def _reset_pending_notes(self):
+        """Clear the notes added since start_chart()"""
+        # (tick, fret, sustain) rows; only the first _note_count are in use
+        self._notes = np.empty((0, 3), dtype=np.int64)
+        self._note_count = 0
+
+    def reserve(self, count: int):
+        """
+        Make room for at least `count` more notes in a single allocation.
+
+        Args:
+            count: Number of notes about to be added
+        """
+        needed = self._note_count + count
+        capacity = len(self._notes)
+        if needed > capacity:
+            grown = np.empty((max(needed, capacity * 2, 64), 3), dtype=np.int64)
+            grown[:self._note_count] = self._notes[:self._note_count]
+            self._notes = grown
+
     def seconds_to_ticks(self, seconds: float, bpm: float) -> int:
         """
         Convert seconds to ticks based on BPM.
@@ -92,29 +124,190 @@ class ChartGenerator:
         Returns:
             List of (tick, fret_number, sustain_ticks)
         """
-        chart_notes = []
+        if not midi_notes:
+            if difficulty not in self.DIFFICULTY_TRACKS:
+                raise ValueError(f"Invalid difficulty: {difficulty}")
+            return []
+
+        columns = np.asarray(midi_notes, dtype=np.float64).reshape(-1, 4)
+        ticks, frets, sustains = self.midi_arrays_to_chart_notes(
+            columns[:, 0], columns[:, 1].astype(np.int64), columns[:, 3], bpm, difficulty
+        )
+
+        return list(zip(ticks.tolist(), frets.tolist(), sustains.tolist()))
+
+    def midi_arrays_to_chart_notes(
+        self,
+        start_times: np.ndarray,
+        note_numbers: np.ndarray,
+        durations: np.ndarray,
+        bpm: float,
+        difficulty: str = "Expert"
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert parallel MIDI note arrays to chart notes in one vectorized pass.
 
+        Args:
+            start_times: Note start times in seconds
+            note_numbers: MIDI note numbers
+            durations: Note durations in seconds
+            bpm: Beats per minute
+            difficulty: Difficulty level
+
+        Returns:
+            (tick, fret_number, sustain_ticks) int64 arrays, sorted by tick
+        """
         if difficulty not in self.DIFFICULTY_TRACKS:
             raise ValueError(f"Invalid difficulty: {difficulty}")
 
         min_note, max_note = self.DIFFICULTY_TRACKS[difficulty]
 
-        for start_time, note_num, velocity, duration in midi_notes:
-            # Check if note is in the range for this difficulty
+        # Keep notes in this difficulty's range that have a fret mapping
+        note_numbers = np.asarray(note_numbers, dtype=np.int64)
+        fret_lut = np.full(max_note - min_note + 1, -1, dtype=np.int64)
+        for note_num, fret in self.MIDI_TO_FRET.items():
             if min_note <= note_num <= max_note:
-                # Map MIDI note to fret number
-                if note_num in self.MIDI_TO_FRET:
-                    fret = self.MIDI_TO_FRET[note_num]
-                    tick = self.seconds_to_ticks(start_time, bpm)
-                    sustain = self.seconds_to_ticks(duration, bpm)
+                fret_lut[note_num - min_note] = fret
 
-                    # Minimum sustain length (avoid very short sustains)
-                    if sustain < 20:
-                        sustain = 0
+        in_range = (note_numbers >= min_note) & (note_numbers <= max_note)
+        frets = np.full(len(note_numbers), -1, dtype=np.int64)
+        frets[in_range] = fret_lut[note_numbers[in_range] - min_note]
+        keep = frets >= 0
 
-                    chart_notes.append((tick, fret, sustain))
+        # Same arithmetic as seconds_to_ticks(), truncating toward zero
+        ticks_per_beat = bpm / 60.0
+        ticks = (np.asarray(start_times, dtype=np.float64)[keep] * ticks_per_beat
+                 * self.resolution).astype(np.int64)
+        sustains = (np.asarray(durations, dtype=np.float64)[keep] * ticks_per_beat
+                    * self.resolution).astype(np.int64)
 
-        return sorted(chart_notes, key=lambda x: x[0])
+        # Minimum sustain length (avoid very short sustains)
+        sustains[sustains < 20] = 0
+
+        order = np.argsort(ticks, kind="stable")
+        return ticks[order], frets[keep][order], sustains[order]
+
+    def start_chart(
+        self,
+        song_name: str,
+        artist: str,
+        charter: str = "MIDI Chart Maker",
+        tempo_bpm: float = 120.0
+    ):
+        """
+        Begin building a chart note by note.
+
+        Args:
+            song_name: Name of the song
+            artist: Artist name
+            charter: Charter name
+            tempo_bpm: Beats per minute
+        """
+        self._song_name = song_name
+        self._artist = artist
+        self._charter = charter
+        self._bpm = tempo_bpm
+        self._reset_pending_notes()
+
+    @property
+    def note_count(self) -> int:
+        """Number of notes added since start_chart()."""
+        return self._note_count
+
+    def add_note(self, tick: int, fret: int, sustain: int = 0):
+        """
+        Add a single note to the chart started with start_chart().
+
+        Args:
+            tick: Tick position
+            fret: Fret number (0-4)
+            sustain: Sustain length in ticks
+        """
+        if self._note_count == len(self._notes):
+            self.reserve(1)
+        self._notes[self._note_count] = (int(tick), int(fret), int(sustain))
+        self._note_count += 1
+
+    def add_notes_bulk(self, ticks, frets, sustains):
+        """
+        Add many notes at once to the chart started with start_chart().
+
+        Args:
+            ticks: Tick positions (sequence or NumPy array)
+            frets: Fret numbers (0-4), parallel to ticks
+            sustains: Sustain lengths in ticks, parallel to ticks
+        """
+        ticks, frets, sustains = (np.asarray(c, dtype=np.int64) for c in (ticks, frets, sustains))
+        if not ticks.size == frets.size == sustains.size:
+            raise ValueError("ticks, frets and sustains must have the same length")
+
+        # Copy the columns straight into the note buffer without creating Python ints
+        start = self._note_count
+        end = start + ticks.size
+        self.reserve(ticks.size)
+        self._notes[start:end, 0] = ticks
+        self._notes[start:end, 1] = frets
+        self._notes[start:end, 2] = sustains
+        self._note_count = end
+
+    def add_notes_fast(self, rows: Iterable[Tuple[int, int, int]]):
+        """
+        Add notes from an iterable of (tick, fret, sustain) rows in one call.
+
+        Args:
+            rows: (tick, fret, sustain) tuples, e.g. from midi_notes_to_chart_notes()
+        """
+        if hasattr(rows, '__len__'):
+            self.reserve(len(rows))
+        for tick, fret, sustain in rows:
+            self.add_note(tick, fret, sustain)
+
+    def snapshot(self) -> "ChartGenerator":
+        """
+        Copy the chart built with start_chart()/add_note().
+
+        The copy can be written from another thread while this generator
+        starts on the next chart.
+
+        Returns:
+            A new ChartGenerator holding the same header fields and notes
+        """
+        copy = ChartGenerator(self.resolution)
+        copy._song_name = self._song_name
+        copy._artist = self._artist
+        copy._charter = self._charter
+        copy._bpm = self._bpm
+        copy._notes = self._notes[:self._note_count].copy()
+        copy._note_count = self._note_count
+        return copy
+
+    def write_chart(self, output_path: str, buffer_size: int = 1 << 20):
+        """
+        Write the chart built with start_chart()/add_note() to a .chart file.
+
+        Notes are formatted and written in chunks, so the whole chart is
+        never held in memory as one string.
+
+        Args:
+            output_path: Path to save the .chart file
+            buffer_size: Size of the file write buffer in bytes
+        """
+        notes = self._notes[:self._note_count]
+        notes = notes[np.argsort(notes[:, 0], kind='stable')]
+        header = self._chart_header_lines(self._song_name, self._artist, self._bpm, self._charter)
+
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+        with open(output_path, 'wb', buffering=buffer_size) as f:
+            f.write(("\n".join(header) + "\n").encode('utf-8'))
+
+            for start in range(0, len(notes), self.WRITE_CHUNK_NOTES):
+                rows = notes[start:start + self.WRITE_CHUNK_NOTES].tolist()
+                f.write("".join(
+                    f"  {tick} = N {fret} {sustain if sustain > 0 else 0}\n"
+                    for tick, fret, sustain in rows
+                ).encode('utf-8'))
+
+            f.write(b"}\n")
 
     def generate_chart_file(
         self,
@@ -157,10 +350,33 @@ class ChartGenerator:
         song_name: str,
         artist: str,
         bpm: float,
-        difficulty: str
+        difficulty: str,
+        charter: str = "MIDI Chart Maker"
     ) -> str:
         """Build the complete .chart file content."""
 
+        content = self._chart_header_lines(song_name, artist, bpm, charter)
+
+        # Add notes
+        content.extend(
+            f"  {tick} = N {fret} {sustain if sustain > 0 else 0}"
+            for tick, fret, sustain in chart_notes
+        )
+
+        content.append("}")
+        content.append("")
+
+        return "\n".join(content)
+
+    def _chart_header_lines(
+        self,
+        song_name: str,
+        artist: str,
+        bpm: float,
+        charter: str
+    ) -> List[str]:
+        """Build every .chart line up to and including the note track's opening brace."""
+
         content = []
 
         # Header
@@ -168,7 +384,7 @@ class ChartGenerator:
         content.append("{")
         content.append(f'  Name = "{song_name}"')
         content.append(f'  Artist = "{artist}"')
-        content.append(f'  Charter = "MIDI Chart Maker"')
+        content.append(f'  Charter = "{charter}"')
         content.append(f"  Resolution = {self.resolution}")
         content.append("}")
         content.append("")
@@ -192,17 +408,7 @@ class ChartGenerator:
         content.append(f"[{track_name}]")
         content.append("{")
 
-        # Add notes
-        for tick, fret, sustain in chart_notes:
-            if sustain > 0:
-                content.append(f"  {tick} = N {fret} {sustain}")
-            else:
-                content.append(f"  {tick} = N {fret} 0")
-
-        content.append("}")
-        content.append("")
-
-        return "\n".join(content)
+        return content
 
     def generate_song_ini(
         self,
@@ -3,6 +3,9 @@ Enhanced Clone Hero Chart Parser
 Supports full .chart format with all Moonscraper features.
 """
 
+import functools
+import os
+import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from enum import Enum
@@ -53,6 +56,39 @@ class Note:
     is_open: bool = False
     velocity: int = 100  # MIDI velocity
 
+    @classmethod
+    def acquire(cls, tick: int, fret: int, sustain: int = 0, **flags) -> 'Note':
+        """
+        Get a Note from the free list, or allocate one if the pool is empty.
+
+        Args:
+            tick: Note position in ticks
+            fret: Fret number
+            sustain: Sustain length in ticks
+            **flags: Optional is_forced/is_tap/is_open/velocity overrides
+
+        Returns:
+            A Note with all fields reset
+        """
+        try:
+            note = _NOTE_POOL.pop()
+        except IndexError:
+            return cls(tick, fret, sustain, **flags)
+
+        note.tick = tick
+        note.fret = fret
+        note.sustain = sustain
+        note.is_forced = flags.get('is_forced', False)
+        note.is_tap = flags.get('is_tap', False)
+        note.is_open = flags.get('is_open', False)
+        note.velocity = flags.get('velocity', 100)
+        return note
+
+    def release(self):
+        """Return this note to the free list. The caller must drop all references to it."""
+        if len(_NOTE_POOL) < _NOTE_POOL_MAX:
+            _NOTE_POOL.append(self)
+
     def is_chord_with(self, other: 'Note') -> bool:
         """Check if this note is part of a chord with another note."""
         return self.tick == other.tick
@@ -101,6 +137,22 @@ class Note:
         return natural_hopo
 
 
+# Precompiled write-time line formatters
+_NOTE_FMT = "  %d = N %d %d".__mod__
+_FORCED_FMT = ("  %%d = N %d 0" % NoteFlag.FORCED.value).__mod__
+_TAP_FMT = ("  %%d = N %d 0" % NoteFlag.TAP.value).__mod__
+_STAR_POWER_FMT = "  %d = S 2 %d".__mod__
+_EVENT_FMT = '  %d = E "%s"'.__mod__
+
+# Read-time matchers: "[Section]" headers, and "tick = TYPE args..." lines
+_SECTION_HEADER_RE = re.compile(r'^[ \t]*\[(.*)\][ \t]*$', re.MULTILINE)
+_EVENT_LINE_RE = re.compile(r'^[ \t]*(\d+)[ \t]*=[ \t]*(\S+)(.*)$', re.MULTILINE)
+
+# Free list of recycled Note objects, shared across parses
+_NOTE_POOL: List[Note] = []
+_NOTE_POOL_MAX = 65536
+
+
 @dataclass
 class StarPowerPhrase:
     """Represents a star power phrase."""
@@ -162,6 +214,12 @@ class Track:
         """Get total note count."""
         return len(self.notes)
 
+    def release_notes(self):
+        """Recycle all notes into the Note pool and empty the track."""
+        for note in self.notes:
+            note.release()
+        self.notes.clear()
+
 
 @dataclass
 class Chart:
@@ -226,6 +284,13 @@ class Chart:
         if instrument in track_map:
             track_map[instrument][difficulty] = track
 
+    def release_notes(self):
+        """Recycle the notes of every track. Call when the chart is being discarded."""
+        for tracks in (self.guitar, self.bass, self.rhythm, self.keys,
+                       self.drums, self.ghl_guitar, self.ghl_bass):
+            for track in tracks.values():
+                track.release_notes()
+
     def get_initial_bpm(self) -> float:
         """Get the initial BPM."""
         if self.bpm_changes:
@@ -270,32 +335,43 @@ class ChartParser:
         return chart
 
     @staticmethod
-    def _split_sections(content: str) -> Dict[str, str]:
-        """Split content into named sections."""
-        sections = {}
-        current_section = None
-        current_content = []
+    def parse_file_cached(file_path: str) -> Chart:
+        """
+        Parse a .chart file, reusing the result while the file is unchanged.
 
-        for line in content.split('\n'):
-            line = line.strip()
+        The returned Chart is shared between callers, so it must not be
+        modified in place or have its notes released.
 
-            # Section header
-            if line.startswith('[') and line.endswith(']'):
-                # Save previous section
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
+        Args:
+            file_path: Path to the .chart file
 
-                # Start new section
-                current_section = line[1:-1]
-                current_content = []
+        Returns:
+            Parsed Chart object
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        return _parse_file_memo(path, stat.st_mtime_ns, stat.st_size)
 
-            # Section content (skip braces)
-            elif line and line != '{' and line != '}':
-                current_content.append(line)
+    @staticmethod
+    def clear_cache():
+        """Forget all memoized parse_file_cached() results."""
+        _parse_file_memo.cache_clear()
+
+    @staticmethod
+    def _split_sections(content: str) -> Dict[str, str]:
+        """
+        Split content into named sections.
+
+        Section bodies are sliced straight out of the file, braces and
+        indentation included; the section parsers skip those lines.
+        """
+        sections = {}
+        headers = list(_SECTION_HEADER_RE.finditer(content))
 
-        # Save last section
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            if header[1]:
+                sections[header[1]] = content[header.end():end]
 
         return sections
 
@@ -337,27 +413,21 @@ class ChartParser:
     @staticmethod
     def _parse_sync_track(chart: Chart, content: str):
         """Parse [SyncTrack] section."""
-        for line in content.split('\n'):
-            line = line.strip()
-            if '=' not in line:
-                continue
-
-            parts = line.split('=', 1)
-            tick = int(parts[0].strip())
-            event_data = parts[1].strip().split()
-
-            event_type = event_data[0]
+        for match in _EVENT_LINE_RE.finditer(content):
+            tick = int(match[1])
+            event_type = match[2]
+            event_data = match[3].split()
 
             if event_type == "B":
                 # BPM change: tick = B milliBPM
-                milli_bpm = int(event_data[1])
+                milli_bpm = int(event_data[0])
                 bpm = milli_bpm / 1000.0
                 chart.bpm_changes.append(BPMChange(tick, bpm))
 
             elif event_type == "TS":
                 # Time signature: tick = TS numerator [denominator]
-                numerator = int(event_data[1])
-                denominator = int(event_data[2]) if len(event_data) > 2 else 2
+                numerator = int(event_data[0])
+                denominator = int(event_data[1]) if len(event_data) > 1 else 2
                 chart.time_signatures.append(TimeSignature(tick, numerator, denominator))
 
     @staticmethod
@@ -384,6 +454,23 @@ class ChartParser:
     @staticmethod
     def _parse_track_section(chart: Chart, section_name: str, content: str):
         """Parse instrument track sections like [ExpertSingle]."""
+        result = ChartParser._parse_track(section_name, content)
+        if result is not None:
+            chart.set_track(*result)
+
+    @staticmethod
+    def _parse_track(section_name: str,
+                     content: str) -> Optional[Tuple[Instrument, Difficulty, Track]]:
+        """
+        Parse a track section without touching the chart.
+
+        Args:
+            section_name: Section header, e.g. "ExpertSingle"
+            content: Section body
+
+        Returns:
+            (instrument, difficulty, track), or None for unknown sections
+        """
         # Parse difficulty and instrument from section name
         difficulty_map = {
             "Easy": Difficulty.EASY,
@@ -414,77 +501,76 @@ class ChartParser:
                 instrument = instrument_map.get(instrument_name)
                 break
 
-        if not difficulty or not instrument:
-            return  # Unknown track
+        if difficulty is None or instrument is None:
+            return None  # Unknown track
 
         # Create track
         track = Track()
 
-        # Parse notes and events
-        note_buffer = {}  # tick -> {fret -> Note} for combining flags
+        # Parse notes and events. Notes in a .chart are ordered by tick, so
+        # only the notes at the current tick need to be held for flag lines.
+        notes = track.notes
+        current_tick = None
+        current_tick_notes: List[Note] = []
 
-        for line in content.split('\n'):
-            line = line.strip()
-            if '=' not in line:
-                continue
-
-            parts = line.split('=', 1)
-            tick = int(parts[0].strip())
-            event_data = parts[1].strip().split()
-
-            event_type = event_data[0]
+        for match in _EVENT_LINE_RE.finditer(content):
+            tick = int(match[1])
+            event_type = match[2]
+            event_data = match[3].split()
 
             if event_type == "N":
                 # Note: tick = N fret sustain
-                fret = int(event_data[1])
-                sustain = int(event_data[2])
+                fret = int(event_data[0])
+                sustain = int(event_data[1])
+
+                if tick != current_tick:
+                    notes.extend(current_tick_notes)
+                    current_tick = tick
+                    current_tick_notes = []
 
                 # Check if this is a flag
                 if fret == NoteFlag.FORCED.value:
-                    # Mark existing note as forced
-                    if tick in note_buffer:
-                        for note in note_buffer[tick].values():
-                            note.is_forced = True
+                    # Mark existing notes as forced
+                    for note in current_tick_notes:
+                        note.is_forced = True
 
                 elif fret == NoteFlag.TAP.value:
-                    # Mark existing note as tap
-                    if tick in note_buffer:
-                        for note in note_buffer[tick].values():
-                            note.is_tap = True
-
-                elif fret == NoteFlag.OPEN.value:
-                    # Open note
-                    note = Note(tick, fret, sustain, is_open=True)
-                    if tick not in note_buffer:
-                        note_buffer[tick] = {}
-                    note_buffer[tick][fret] = note
+                    # Mark existing notes as tap
+                    for note in current_tick_notes:
+                        note.is_tap = True
 
                 else:
-                    # Regular note (0-4 for 5-fret)
-                    note = Note(tick, fret, sustain)
-                    if tick not in note_buffer:
-                        note_buffer[tick] = {}
-                    note_buffer[tick][fret] = note
+                    # Open note or regular note (0-4 for 5-fret)
+                    if fret == NoteFlag.OPEN.value:
+                        note = Note.acquire(tick, fret, sustain, is_open=True)
+                    else:
+                        note = Note.acquire(tick, fret, sustain)
+
+                    # A repeated fret at the same tick replaces the earlier note
+                    for i, existing in enumerate(current_tick_notes):
+                        if existing.fret == fret:
+                            current_tick_notes[i] = note
+                            break
+                    else:
+                        current_tick_notes.append(note)
 
             elif event_type == "S":
                 # Star power: tick = S type length
-                sp_type = int(event_data[1])
-                length = int(event_data[2])
+                sp_type = int(event_data[0])
+                length = int(event_data[1])
                 if sp_type == 2:  # Star power phrase
                     track.star_power.append(StarPowerPhrase(tick, length))
 
             elif event_type == "E":
                 # Local event
-                event_text = ' '.join(event_data[1:]).strip('"')
+                event_text = ' '.join(event_data).strip('"')
                 track.events.append(Event(tick, event_text))
 
-        # Add all notes to track
-        for tick_notes in note_buffer.values():
-            for note in tick_notes.values():
-                track.add_note(note)
+        # Flush the last tick and sort once
+        notes.extend(current_tick_notes)
+        notes.sort(key=lambda n: (n.tick, n.fret))
 
-        # Set track in chart
-        chart.set_track(instrument, difficulty, track)
+        return instrument, difficulty, track
 
     @staticmethod
     def write_file(chart: Chart, file_path: str):
@@ -552,9 +638,12 @@ class ChartParser:
         # Instrument tracks
         ChartParser._write_tracks(lines, chart)
 
-        # Write to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        # The file is about to change, so memoized parses are stale
+        ChartParser.clear_cache()
+
+        # Encode once and write the whole file in a single call
+        with open(file_path, 'wb') as f:
+            f.write('\n'.join(lines).encode('utf-8'))
 
     @staticmethod
     def _write_tracks(lines: List[str], chart: Chart):
@@ -586,28 +675,37 @@ class ChartParser:
                     lines.append("{")
 
                     # Write notes
+                    append = lines.append
                     for note in sorted(track.notes, key=lambda n: (n.tick, n.fret)):
+                        tick = note.tick
+
                         # Main note
-                        lines.append(f"  {note.tick} = N {note.fret} {note.sustain}")
+                        append(_NOTE_FMT((tick, note.fret, note.sustain)))
 
                         # Flags
                         if note.is_forced:
-                            lines.append(f"  {note.tick} = N {NoteFlag.FORCED.value} 0")
+                            append(_FORCED_FMT(tick))
                         if note.is_tap:
-                            lines.append(f"  {note.tick} = N {NoteFlag.TAP.value} 0")
+                            append(_TAP_FMT(tick))
 
                     # Write star power
                     for sp in sorted(track.star_power, key=lambda x: x.tick):
-                        lines.append(f"  {sp.tick} = S 2 {sp.length}")
+                        append(_STAR_POWER_FMT((sp.tick, sp.length)))
 
                     # Write local events
                     for event in sorted(track.events, key=lambda x: x.tick):
-                        lines.append(f'  {event.tick} = E "{event.text}"')
+                        append(_EVENT_FMT((event.tick, event.text)))
 
                     lines.append("}")
                     lines.append("")
 
 
+@functools.lru_cache(maxsize=16)
+def _parse_file_memo(path: str, mtime_ns: int, size: int) -> Chart:
+    """Memoized parse keyed on the file's path, modification time and size."""
+    return ChartParser.parse_file(path)
+
+
 if __name__ == "__main__":
     # Test parser
     print("Chart Parser Test")
@@ -3,11 +3,48 @@ Chorus Encore API Client
 Search and download charts from the Chorus Encore database.
 """
 
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, fields, astuple, replace
 from enum import Enum
-import time
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    import json as _json
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; only needed for HTTP/2
+    httpx = None
+
+try:
+    import requests_cache
+except ImportError:  # requests-cache is optional; searches just aren't persisted
+    requests_cache = None
+else:
+    # Serving a stale search offline logs a full traceback otherwise
+    logging.getLogger("requests_cache").addHandler(logging.NullHandler())
+
+# Errors raised by either HTTP backend
+_HTTP_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+# Fixed-layout instances for the many Chart objects a session creates
+# (dataclass slots need Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class SortType(Enum):
@@ -40,19 +77,19 @@ class Instrument(Enum):
     VOCALS = "vocals"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Chart:
     """Represents a chart from Chorus Encore."""
-    chartId: int
-    songId: int
-    groupId: int
-    versionGroupId: int
-    md5: str
-    chartHash: str
+    chartId: int = 0
+    songId: int = 0
+    groupId: int = 0
+    versionGroupId: int = 0
+    md5: str = ""
+    chartHash: str = ""
 
     # Metadata
-    name: str
-    artist: str
+    name: str = ""
+    artist: str = ""
     album: str = ""
     genre: str = ""
     year: str = ""
@@ -85,14 +122,27 @@ class Chart:
     has2xKick: bool = False
     isModchart: bool = False
 
+    # Lazily built download URLs
+    _url_video: str = field(default="", init=False, repr=False, compare=False)
+    _url_novideo: str = field(default="", init=False, repr=False, compare=False)
+
     def get_download_url(self, include_video: bool = True) -> str:
         """Get the CDN download URL for this chart."""
-        base_url = "https://files.enchor.us"
-        suffix = ".sng" if include_video else "_novideo.sng"
-        return f"{base_url}/{self.md5}{suffix}"
+        attr = "_url_video" if include_video else "_url_novideo"
+        url = getattr(self, attr)
+        if not url:
+            base_url = "https://files.enchor.us"
+            suffix = ".sng" if include_video else "_novideo.sng"
+            url = f"{base_url}/{self.md5}{suffix}"
+            setattr(self, attr, url)
+        return url
 
 
-@dataclass
+# Response keys that map directly onto Chart fields
+_CHART_FIELDS = frozenset(f.name for f in fields(Chart) if f.init)
+
+
+@dataclass(**_SLOTS)
 class SearchParams:
     """Parameters for chart search."""
     query: str = "*"
@@ -132,7 +182,7 @@ class SearchParams:
     is_modchart: Optional[bool] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SearchResult:
     """Result from chart search."""
     charts: List[Chart] = field(default_factory=list)
@@ -141,37 +191,272 @@ class SearchResult:
     search_time: float = 0.0
 
 
+# Enum member -> API string, resolved once
+_INST_VALUES = {inst: inst.value for inst in Instrument}
+_SORT_VALUES = {sort: sort.value for sort in SortType}
+_DIR_VALUES = {direction: direction.value for direction in SortDirection}
+
+
+def _user_cache_dir() -> str:
+    """Per-user cache directory for this application."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "CloneHeroChartMaker")
+
+
+class _SearchStore:
+    """SQLite table of raw search responses, shared across runs."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache"
+                "(key TEXT PRIMARY KEY, payload BLOB, ts INTEGER)"
+            )
+
+    def get(self, key: str, max_age: float) -> Optional[bytes]:
+        """Stored response for key if it is at most max_age seconds old."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM search_cache WHERE key = ? AND ts > ?",
+                (key, int(time.time() - max_age))
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, payload: bytes):
+        """Store (or replace) the response for key."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, payload, ts) VALUES (?, ?, ?)",
+                (key, payload, int(time.time()))
+            )
+
+    def clear(self):
+        """Delete every stored response."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM search_cache")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _noop_progress(_percent: float):
+    """Default download progress callback."""
+
+
+def _non_empty(value):
+    """Drop empty strings and False from the payload."""
+    return value or None
+
+
+# SearchParams attribute -> JSON key -> transform, for the general search
+_SEARCH_FIELD_MAP = (
+    ("instrument", "instrument", _INST_VALUES.__getitem__),
+    ("difficulty", "difficulty", None),
+    ("drums_reviewed", "drumsReviewed", _non_empty),
+)
+
+# Advanced search accepts the general filters plus metadata and features
+_ADVANCED_FIELD_MAP = _SEARCH_FIELD_MAP + (
+    ("artist", "artist", _non_empty),
+    ("album", "album", _non_empty),
+    ("genre", "genre", _non_empty),
+    ("year", "year", _non_empty),
+    ("charter", "charter", _non_empty),
+    ("has_solo_sections", "hasSoloSections", None),
+    ("has_forced_notes", "hasForcedNotes", None),
+    ("has_open_notes", "hasOpenNotes", None),
+    ("has_tap_notes", "hasTapNotes", None),
+    ("has_lyrics", "hasLyrics", None),
+    ("has_vocals", "hasVocals", None),
+    ("has_video", "hasVideoBackground", None),
+    ("is_modchart", "isModchart", None),
+)
+
+# JSON key -> (min, max) SearchParams attributes for numeric ranges
+_ADVANCED_RANGE_MAP = (
+    ("length", "length_min", "length_max"),
+    ("intensity", "intensity_min", "intensity_max"),
+)
+
+
 class ChorusAPI:
     """Client for the Chorus Encore API."""
 
     BASE_URL = "https://api.enchor.us"
     CDN_URL = "https://files.enchor.us"
 
-    def __init__(self, source: str = "CloneHeroChartMaker"):
+    # Retry policy applied by the HTTPAdapter (and _http2_send() on HTTP/2)
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 0.25
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    # Download streaming sizes
+    DOWNLOAD_CHUNK_SIZE = 256 * 1024
+    DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+    # Search result cache (entries expire so chart database updates still appear)
+    CACHE_SIZE = 256
+    CACHE_TTL = 60.0
+
+    # On-disk search response cache, shared across runs (requests-cache when
+    # available on the requests backend, otherwise a plain SQLite store)
+    DISK_CACHE_NAME = "chorus_cache"
+    DISK_CACHE_TTL = 900
+
+    # Age up to which a stored search is still served when the API is unreachable
+    OFFLINE_CACHE_TTL = 7 * 24 * 3600
+
+    def __init__(
+        self,
+        source: str = "CloneHeroChartMaker",
+        http2: bool = False,
+        disk_cache: bool = True
+    ):
         """
         Initialize the API client.
 
         Args:
             source: Identifier for your application
+            http2: Use an HTTP/2 httpx client so searches and downloads share
+                one multiplexed connection per host. Falls back to requests
+                if httpx (with h2) is not installed.
+            disk_cache: Persist search responses in the user cache directory,
+                through requests-cache when available on the requests backend
+                or else a built-in SQLite store. Either one also answers
+                previously seen searches while the API is unreachable
         """
         self.source = source
-        self.session = requests.Session()
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._store: Optional[_SearchStore] = None
+
+        self.http2 = False
+        self.disk_cache = False
+        if http2 and httpx is not None:
+            try:
+                # The transport owns the pool, so limits go here (a Client
+                # ignores its own limits= once a transport is given). Its
+                # retries only cover connection errors; statuses are retried
+                # in _http2_send()
+                self.session = httpx.Client(
+                    transport=httpx.HTTPTransport(
+                        http2=True,
+                        retries=self.MAX_RETRIES,
+                        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+                    ),
+                    timeout=httpx.Timeout(30.0, connect=5.0),
+                    headers={"Content-Type": "application/json"}
+                )
+                self.http2 = True
+                if disk_cache:
+                    self._open_store()
+                return
+            except ImportError:
+                pass  # h2 not installed
+
+        # One on-disk cache per backend: requests-cache when installed (its
+        # stale_if_error covers offline use), otherwise the built-in store
+        self.disk_cache = disk_cache and requests_cache is not None
+        if disk_cache and not self.disk_cache:
+            self._open_store()
+        if self.disk_cache:
+            os.makedirs(_user_cache_dir(), exist_ok=True)
+            self.session = requests_cache.CachedSession(
+                os.path.join(_user_cache_dir(), self.DISK_CACHE_NAME),
+                backend="sqlite",
+                expire_after=self.DISK_CACHE_TTL,
+                stale_if_error=self.OFFLINE_CACHE_TTL,
+                # Only search POSTs; .sng downloads (GET) never enter the cache
+                allowable_methods=("POST",),
+                match_headers=False
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
         })
 
-    def search(self, params: SearchParams) -> SearchResult:
+        # Retry transient failures and keep enough warm connections for
+        # concurrent searches and downloads
+        retry = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=self.BACKOFF_BASE,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=32, pool_block=False, max_retries=retry
+        )
+        self.session.mount(self.BASE_URL, adapter)
+        self.session.mount(self.CDN_URL, adapter)
+
+    def _open_store(self):
+        """Open the built-in search store (left disabled if the file can't be used)."""
+        path = os.path.join(_user_cache_dir(), f"{self.DISK_CACHE_NAME}.db")
+        try:
+            self._store = _SearchStore(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Search cache disabled: {e}")
+
+    def close(self):
+        """Close the underlying HTTP session and its connection pool."""
+        self.session.close()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def __enter__(self) -> 'ChorusAPI':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def clear_cache(self):
+        """Drop all cached search results."""
+        with self._cache_lock:
+            self._cache.clear()
+        if self._store is not None:
+            self._store.clear()
+        if self.disk_cache:
+            self.session.cache.clear()
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Fraction of searches answered from the in-memory cache."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def _build_payload(
+        self,
+        params: SearchParams,
+        field_map: Tuple[Tuple[str, str, Optional[Callable[[Any], Any]]], ...],
+        range_map: Tuple[Tuple[str, str, str], ...] = ()
+    ) -> Dict[str, Any]:
         """
-        Search for charts using general search.
+        Build a search request body from a field table.
 
         Args:
             params: Search parameters
+            field_map: (attribute, JSON key, transform) entries; a None
+                value (before or after transform) leaves the key out
+            range_map: (JSON key, min attribute, max attribute) entries
 
         Returns:
-            SearchResult with matching charts
+            JSON request body
         """
-        url = f"{self.BASE_URL}/search"
-
         payload = {
             "search": params.query,
             "per_page": params.per_page,
@@ -179,38 +464,46 @@ class ChorusAPI:
             "source": self.source
         }
 
-        # Add optional filters
-        if params.instrument:
-            payload["instrument"] = params.instrument.value
-
-        if params.difficulty is not None:
-            payload["difficulty"] = params.difficulty
+        for attr, key, transform in field_map:
+            value = getattr(params, attr)
+            if value is not None and transform is not None:
+                value = transform(value)
+            if value is not None:
+                payload[key] = value
+
+        for key, min_attr, max_attr in range_map:
+            low = getattr(params, min_attr)
+            high = getattr(params, max_attr)
+            if low is not None or high is not None:
+                bounds = payload[key] = {}
+                if low:
+                    bounds["min"] = low
+                if high:
+                    bounds["max"] = high
 
-        if params.drums_reviewed:
-            payload["drumsReviewed"] = True
-
-        # Add sorting
         if params.sort_type:
             payload["sort"] = {
-                "type": params.sort_type.value,
-                "direction": params.sort_direction.value
+                "type": _SORT_VALUES[params.sort_type],
+                "direction": _DIR_VALUES[params.sort_direction]
             }
 
-        # Make request with retry logic
-        max_retries = 10
-        for attempt in range(max_retries):
-            try:
-                response = self.session.post(url, json=payload, timeout=30)
-                response.raise_for_status()
+        return payload
 
-                data = response.json()
-                return self._parse_search_result(data)
+    def search(self, params: SearchParams) -> SearchResult:
+        """
+        Search for charts using general search.
+
+        Args:
+            params: Search parameters
 
-            except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                    continue
-                raise Exception(f"Search failed after {max_retries} attempts: {e}")
+        Returns:
+            SearchResult with matching charts
+        """
+        url = f"{self.BASE_URL}/search"
+
+        payload = self._build_payload(params, _SEARCH_FIELD_MAP)
+
+        return self._cached_search(url, params, payload, "Search")
 
     def advanced_search(self, params: SearchParams) -> SearchResult:
         """
@@ -224,130 +517,214 @@ class ChorusAPI:
         """
         url = f"{self.BASE_URL}/search/advanced"
 
-        payload = {
-            "search": params.query,
-            "per_page": params.per_page,
-            "page": params.page,
-            "source": self.source
-        }
+        payload = self._build_payload(params, _ADVANCED_FIELD_MAP, _ADVANCED_RANGE_MAP)
 
-        # Basic filters
-        if params.instrument:
-            payload["instrument"] = params.instrument.value
-        if params.difficulty is not None:
-            payload["difficulty"] = params.difficulty
-        if params.drums_reviewed:
-            payload["drumsReviewed"] = True
-
-        # Metadata filters
-        if params.artist:
-            payload["artist"] = params.artist
-        if params.album:
-            payload["album"] = params.album
-        if params.genre:
-            payload["genre"] = params.genre
-        if params.year:
-            payload["year"] = params.year
-        if params.charter:
-            payload["charter"] = params.charter
-
-        # Numeric ranges
-        if params.length_min is not None or params.length_max is not None:
-            payload["length"] = {}
-            if params.length_min:
-                payload["length"]["min"] = params.length_min
-            if params.length_max:
-                payload["length"]["max"] = params.length_max
-
-        if params.intensity_min is not None or params.intensity_max is not None:
-            payload["intensity"] = {}
-            if params.intensity_min:
-                payload["intensity"]["min"] = params.intensity_min
-            if params.intensity_max:
-                payload["intensity"]["max"] = params.intensity_max
-
-        # Boolean features
-        if params.has_solo_sections is not None:
-            payload["hasSoloSections"] = params.has_solo_sections
-        if params.has_forced_notes is not None:
-            payload["hasForcedNotes"] = params.has_forced_notes
-        if params.has_open_notes is not None:
-            payload["hasOpenNotes"] = params.has_open_notes
-        if params.has_tap_notes is not None:
-            payload["hasTapNotes"] = params.has_tap_notes
-        if params.has_lyrics is not None:
-            payload["hasLyrics"] = params.has_lyrics
-        if params.has_vocals is not None:
-            payload["hasVocals"] = params.has_vocals
-        if params.has_video is not None:
-            payload["hasVideoBackground"] = params.has_video
-        if params.is_modchart is not None:
-            payload["isModchart"] = params.is_modchart
-
-        # Sorting
-        if params.sort_type:
-            payload["sort"] = {
-                "type": params.sort_type.value,
-                "direction": params.sort_direction.value
-            }
+        return self._cached_search(url, params, payload, "Advanced search")
 
-        # Make request with retry logic
-        max_retries = 10
-        for attempt in range(max_retries):
-            try:
-                response = self.session.post(url, json=payload, timeout=30)
-                response.raise_for_status()
+    def search_all(
+        self,
+        params: SearchParams,
+        max_pages: int = 10,
+        workers: int = 8,
+        advanced: bool = False
+    ) -> SearchResult:
+        """
+        Fetch several result pages concurrently and merge them.
+
+        The first page (params.page) is fetched to learn the total result
+        count; the remaining pages are requested in parallel over the
+        pooled session.
+
+        Args:
+            params: Search parameters for the first page
+            max_pages: Maximum number of pages to fetch
+            workers: Number of concurrent requests
+            advanced: Use advanced search instead of general search
+
+        Returns:
+            SearchResult with the charts of all fetched pages in page order
+        """
+        search = self.advanced_search if advanced else self.search
+
+        first = search(params)
+        total_pages = -(-first.total_found // params.per_page) if params.per_page > 0 else 1
+        # Pages left from the starting page onwards (always at least that page)
+        needed_pages = min(max_pages, max(total_pages - params.page, 1))
+
+        results = [first]
+        if needed_pages > 1:
+            pages = range(params.page + 1, params.page + needed_pages)
+            with ThreadPoolExecutor(max_workers=min(workers, len(pages))) as executor:
+                # map() yields results in page order
+                results.extend(executor.map(lambda page: search(replace(params, page=page)), pages))
+
+        charts = [chart for result in results for chart in result.charts]
+        return SearchResult(
+            charts=charts,
+            page=first.page,
+            total_found=first.total_found,
+            search_time=sum(result.search_time for result in results)
+        )
+
+    def _cached_search(
+        self,
+        url: str,
+        params: SearchParams,
+        payload: Dict[str, Any],
+        label: str
+    ) -> SearchResult:
+        """
+        Run a search, reusing a recent result for identical parameters.
+
+        Args:
+            url: Search endpoint URL
+            params: Search parameters (used as the cache key)
+            payload: JSON request body built from params
+            label: Name used in error messages
+
+        Returns:
+            SearchResult with matching charts
+        """
+        # Searches are case-insensitive, so "ACDC " and "acdc" share an entry
+        values = astuple(params)
+        key = (url, values[0].strip().casefold()) + values[1:]
+        now = time.monotonic()
+
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[0] < self.CACHE_TTL:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return entry[1]
+            self.cache_misses += 1
+
+        result = self._parse_search_result(self._search_data(url, payload, label))
+
+        with self._cache_lock:
+            cache = self._cache
+            cache[key] = (now, result)
+            cache.move_to_end(key)
+            if len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+
+            # Expired results would otherwise stay referenced until CACHE_SIZE
+            # newer searches push them out; drop them from the LRU end
+            while cache:
+                oldest_time, _ = next(iter(cache.values()))
+                if now - oldest_time < self.CACHE_TTL:
+                    break
+                cache.popitem(last=False)
+
+        return result
+
+    def _search_data(self, url: str, payload: Dict[str, Any], label: str) -> Dict[str, Any]:
+        """
+        Fetch a search response, through the built-in store when it is open.
+
+        A stored response younger than DISK_CACHE_TTL is used without a
+        request. If the request fails, a stored response up to
+        OFFLINE_CACHE_TTL old is used instead. (With requests-cache the
+        session does both and the store is not opened.)
+
+        Args:
+            url: Search endpoint URL
+            payload: JSON request body
+            label: Name used in error messages
+
+        Returns:
+            Decoded JSON response
+        """
+        store = self._store
+        if store is None:
+            return self._post_json(url, payload, label)
 
-                data = response.json()
-                return self._parse_search_result(data)
+        key = f"{url} {json.dumps(payload, sort_keys=True)}"
+        raw = store.get(key, self.DISK_CACHE_TTL)
+        if raw is not None:
+            return self._decode_json(raw, label)
 
-            except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                    continue
-                raise Exception(f"Advanced search failed after {max_retries} attempts: {e}")
+        try:
+            raw = self._post(url, payload, label)
+        except RuntimeError:
+            # API unreachable: fall back to an older copy of the same search
+            raw = store.get(key, self.OFFLINE_CACHE_TTL)
+            if raw is None:
+                raise
+            return self._decode_json(raw, label)
+
+        data = self._decode_json(raw, label)
+        store.put(key, raw)
+        return data
+
+    def _post_json(self, url: str, payload: Dict[str, Any], label: str) -> Dict[str, Any]:
+        """
+        POST a JSON payload and decode the response.
+
+        Transient failures are retried by the session's transport.
+
+        Args:
+            url: Endpoint URL
+            payload: JSON request body
+            label: Name used in the error message
+
+        Returns:
+            Decoded JSON response
+        """
+        return self._decode_json(self._post(url, payload, label), label)
+
+    def _post(self, url: str, payload: Dict[str, Any], label: str) -> bytes:
+        """POST a JSON payload and return the raw response body."""
+        try:
+            body = _json.dumps(payload)
+            if self.http2:
+                response = self._http2_send(self.session.build_request("POST", url, content=body))
+            else:
+                response = self.session.post(url, data=body, timeout=(5, 30))
+            response.raise_for_status()
+            return response.content
+        except _HTTP_ERRORS as e:
+            raise RuntimeError(f"{label} failed: {e}") from e
+
+    def _http2_send(self, request, stream: bool = False):
+        """
+        Send an httpx request, retrying RETRY_STATUSES like the requests backend's Retry.
+
+        Waits BACKOFF_BASE * 2**attempt seconds between tries, or the
+        server's Retry-After when it gives one in seconds.
+
+        Returns:
+            The last response (still open when stream is True)
+        """
+        for attempt in range(self.MAX_RETRIES):
+            response = self.session.send(request, stream=stream)
+            if response.status_code not in self.RETRY_STATUSES:
+                return response
+
+            retry_after = response.headers.get("retry-after", "")
+            delay = float(retry_after) if retry_after.isdigit() else self.BACKOFF_BASE * 2 ** attempt
+            response.close()
+            time.sleep(delay)
+
+        return self.session.send(request, stream=stream)
+
+    @staticmethod
+    def _decode_json(raw: bytes, label: str) -> Dict[str, Any]:
+        """Decode a JSON response body."""
+        try:
+            return _json.loads(raw)
+        except ValueError as e:
+            raise RuntimeError(f"{label} returned invalid JSON: {e}") from e
 
     def _parse_search_result(self, data: Dict[str, Any]) -> SearchResult:
         """Parse API response into SearchResult."""
-        charts = []
-
-        for chart_data in data.get("data", []):
-            chart = Chart(
-                chartId=chart_data.get("chartId", 0),
-                songId=chart_data.get("songId", 0),
-                groupId=chart_data.get("groupId", 0),
-                versionGroupId=chart_data.get("versionGroupId", 0),
-                md5=chart_data.get("md5", ""),
-                chartHash=chart_data.get("chartHash", ""),
-                name=chart_data.get("name", ""),
-                artist=chart_data.get("artist", ""),
-                album=chart_data.get("album", ""),
-                genre=chart_data.get("genre", ""),
-                year=chart_data.get("year", ""),
-                charter=chart_data.get("charter", ""),
-                diff_guitar=chart_data.get("diff_guitar", -1),
-                diff_bass=chart_data.get("diff_bass", -1),
-                diff_rhythm=chart_data.get("diff_rhythm", -1),
-                diff_drums=chart_data.get("diff_drums", -1),
-                diff_drums_real=chart_data.get("diff_drums_real", -1),
-                diff_keys=chart_data.get("diff_keys", -1),
-                diff_guitarghl=chart_data.get("diff_guitarghl", -1),
-                diff_bassghl=chart_data.get("diff_bassghl", -1),
-                diff_vocals=chart_data.get("diff_vocals", -1),
-                song_length=chart_data.get("song_length", 0),
-                hasVideoBackground=chart_data.get("hasVideoBackground", False),
-                modifiedTime=chart_data.get("modifiedTime", 0),
-                hasSoloSections=chart_data.get("hasSoloSections", False),
-                hasForcedNotes=chart_data.get("hasForcedNotes", False),
-                hasOpenNotes=chart_data.get("hasOpenNotes", False),
-                hasTapNotes=chart_data.get("hasTapNotes", False),
-                hasLyrics=chart_data.get("hasLyrics", False),
-                hasVocals=chart_data.get("hasVocals", False),
-                hasRollLanes=chart_data.get("hasRollLanes", False),
-                has2xKick=chart_data.get("has2xKick", False),
-                isModchart=chart_data.get("isModchart", False),
-            )
-            charts.append(chart)
+        # Local bindings keep global lookups out of the per-row loop
+        rows = data.get("data") or ()
+        chart_cls = Chart
+        chart_fields = _CHART_FIELDS
+        charts = [
+            chart_cls(**{k: v for k, v in chart_data.items() if k in chart_fields})
+            for chart_data in rows
+        ]
 
         return SearchResult(
             charts=charts,
@@ -356,12 +733,32 @@ class ChorusAPI:
             search_time=data.get("searchTime", 0.0)
         )
 
+    @contextmanager
+    def _stream(self, url: str):
+        """
+        Stream a GET response from either HTTP backend.
+
+        Yields:
+            (response headers, iterator of body chunks)
+        """
+        if self.http2:
+            response = self._http2_send(self.session.build_request("GET", url), stream=True)
+            try:
+                response.raise_for_status()
+                yield response.headers, response.iter_bytes(chunk_size=self.DOWNLOAD_CHUNK_SIZE)
+            finally:
+                response.close()
+        else:
+            with self.session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                yield response.headers, response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE)
+
     def download_chart(
         self,
         chart: Chart,
         output_path: str,
         include_video: bool = True,
-        progress_callback: Optional[callable] = None
+        progress_callback: Callable[[float], None] = _noop_progress
     ) -> bool:
         """
         Download a chart file.
@@ -378,21 +775,26 @@ class ChorusAPI:
         url = chart.get_download_url(include_video)
 
         try:
-            response = self.session.get(url, stream=True, timeout=30)
-            response.raise_for_status()
+            with self._stream(url) as (headers, chunks), \
+                    open(output_path, 'wb', buffering=self.DOWNLOAD_BUFFER_SIZE) as f:
+                total_size = int(headers.get('content-length', 0))
+                downloaded = 0
+                last_percent = -1
 
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
+                # Progress is only reportable when the size is known
+                report = progress_callback if progress_callback and total_size > 0 else _noop_progress
+                percent_per_byte = 100.0 / total_size if total_size > 0 else 0.0
 
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in chunks:
                     if chunk:
                         f.write(chunk)
                         downloaded += len(chunk)
 
-                        if progress_callback and total_size > 0:
-                            percent = (downloaded / total_size) * 100
-                            progress_callback(percent)
+                        # Only report whole-percent changes
+                        percent = downloaded * percent_per_byte
+                        if int(percent) != last_percent:
+                            last_percent = int(percent)
+                            report(percent)
 
             return True
 
@@ -406,38 +808,37 @@ if __name__ == "__main__":
     print("Chorus API Client Test")
     print("=" * 60)
 
-    api = ChorusAPI()
-
-    # Test search
-    print("\nSearching for 'Through the Fire and Flames'...")
-    params = SearchParams(
-        query="Through the Fire and Flames",
-        per_page=5
-    )
-
-    result = api.search(params)
-    print(f"Found {result.total_found} results ({result.search_time:.2f}s)")
-
-    for chart in result.charts[:5]:
-        print(f"\n  {chart.name} - {chart.artist}")
-        print(f"  Charter: {chart.charter}")
-        print(f"  Difficulties: G:{chart.diff_guitar} B:{chart.diff_bass} D:{chart.diff_drums}")
-        print(f"  MD5: {chart.md5}")
-        print(f"  Download: {chart.get_download_url(False)}")
-
-    # Test advanced search
-    print("\n" + "=" * 60)
-    print("\nAdvanced search for expert guitar charts...")
-    adv_params = SearchParams(
-        query="*",
-        instrument=Instrument.GUITAR,
-        difficulty=6,  # Expert
-        per_page=5
-    )
-
-    adv_result = api.advanced_search(adv_params)
-    print(f"Found {adv_result.total_found} expert guitar charts")
-
-    for chart in adv_result.charts[:3]:
-        print(f"\n  {chart.name} - {chart.artist}")
-        print(f"  Expert Guitar: {chart.diff_guitar}")
+    with ChorusAPI() as api:
+        # Test search
+        print("\nSearching for 'Through the Fire and Flames'...")
+        params = SearchParams(
+            query="Through the Fire and Flames",
+            per_page=5
+        )
+
+        result = api.search(params)
+        print(f"Found {result.total_found} results ({result.search_time:.2f}s)")
+
+        for chart in result.charts[:5]:
+            print(f"\n  {chart.name} - {chart.artist}")
+            print(f"  Charter: {chart.charter}")
+            print(f"  Difficulties: G:{chart.diff_guitar} B:{chart.diff_bass} D:{chart.diff_drums}")
+            print(f"  MD5: {chart.md5}")
+            print(f"  Download: {chart.get_download_url(False)}")
+
+        # Test advanced search
+        print("\n" + "=" * 60)
+        print("\nAdvanced search for expert guitar charts...")
+        adv_params = SearchParams(
+            query="*",
+            instrument=Instrument.GUITAR,
+            difficulty=6,  # Expert
+            per_page=5
+        )
+
+        adv_result = api.advanced_search(adv_params)
+        print(f"Found {adv_result.total_found} expert guitar charts")
+
+        for chart in adv_result.charts[:3]:
+            print(f"\n  {chart.name} - {chart.artist}")
+            print(f"  Expert Guitar: {chart.diff_guitar}")
@@ -3,9 +3,11 @@ Controller Capture - Capture input from game controllers (Xbox 360 Xplorer, etc.
 For use with Clone Hero guitar controllers
 """
 
+import numpy as np
 import pygame
 import time
-from typing import List, Dict, Optional, Tuple
+from array import array
+from typing import Callable, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import IntEnum
 
@@ -17,21 +19,74 @@ class GuitarButton(IntEnum):
     BLUE = 3
     ORANGE = 4
 
+# Display names indexed by fret number
+_FRET_NAMES = ("GREEN", "RED", "YELLOW", "BLUE", "ORANGE")
+
+# Joystick events that drive note on/off while recording
+_BUTTON_EVENTS = (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP)
+
 class ControllerCapture:
     """Capture input from game controllers like Xbox 360 Xplorer guitar"""
 
-    def __init__(self):
+    def __init__(self, verbose: bool = False):
+        """
+        Args:
+            verbose: Print every note on/off event while recording
+        """
         pygame.init()
         pygame.joystick.init()
         self.controller: Optional[pygame.joystick.Joystick] = None
         self.recording = False
+        self.verbose = verbose
         self.start_time = 0
-        self.notes: List[Tuple[int, int, float]] = []  # (fret, velocity, timestamp)
+        self._reset_events()
+        self._on_note: Optional[Callable[[int, float, float], None]] = None
 
         # Button state tracking for note-on/note-off
         self.button_states = {i: False for i in range(5)}
         self.note_start_times = {i: 0 for i in range(5)}
 
+    def _reset_events(self):
+        """Clear recorded note events (stored as parallel typed arrays)"""
+        self._frets = array('b')
+        self._vels = array('b')
+        self._ts = array('d')
+        self._is_on = array('b')
+
+    def _add_event(self, fret: int, velocity: int, timestamp: float, is_note_on: bool):
+        """Record one note on/off event"""
+        self._frets.append(fret)
+        self._vels.append(velocity)
+        self._ts.append(timestamp)
+        self._is_on.append(is_note_on)
+
+    @property
+    def notes(self) -> List[Tuple[int, int, float, bool]]:
+        """Recorded note events: (fret, velocity, timestamp, is_note_on)"""
+        return [(fret, vel, ts, bool(on))
+                for fret, vel, ts, on in zip(self._frets, self._vels, self._ts, self._is_on)]
+
+    @property
+    def event_count(self) -> int:
+        """Number of recorded note events"""
+        return len(self._ts)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Recorded note events as zero-copy NumPy views
+
+        Returns:
+            Dict of parallel 'fret' (int8), 'velocity' (int8), 'timestamp'
+            (float64) and 'is_note_on' (int8) arrays, valid until the next
+            recording starts
+        """
+        return {
+            'fret': np.frombuffer(self._frets, dtype=np.int8),
+            'velocity': np.frombuffer(self._vels, dtype=np.int8),
+            'timestamp': np.frombuffer(self._ts, dtype=np.float64),
+            'is_note_on': np.frombuffer(self._is_on, dtype=np.int8),
+        }
+
     def list_controllers(self) -> List[str]:
         """List all available game controllers"""
         pygame.joystick.quit()
@@ -99,10 +154,9 @@ class ControllerCapture:
         print("(Press Ctrl+C to skip and use default mapping)\n")
 
         mapping = {}
-        fret_names = ["GREEN", "RED", "YELLOW", "BLUE", "ORANGE"]
 
         try:
-            for fret_id, fret_name in enumerate(fret_names):
+            for fret_id, fret_name in enumerate(_FRET_NAMES):
                 print(f"Press the {fret_name} fret button...", end=" ", flush=True)
 
                 # Wait for button press
@@ -146,12 +200,25 @@ class ControllerCapture:
         else:
             self.button_mapping = self.get_guitar_button_mapping()
 
+        # Cache controller info and the usable part of the mapping for process_events
+        self._num_buttons = self.controller.get_numbuttons()
+        self._instance_id = self.controller.get_instance_id()
+        self._button_frets = {
+            button_id: int(fret_id) for button_id, fret_id in self.button_mapping.items()
+            if button_id < self._num_buttons
+        }
+
         self.recording = True
-        self.start_time = time.time()
-        self.notes = []
+        self._reset_events()
         self.button_states = {i: False for i in range(5)}
         self.note_start_times = {i: 0 for i in range(5)}
 
+        # Only wake the event queue for button presses while recording
+        pygame.event.clear()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.QUIT])
+        self.start_time = time.perf_counter()
+
         print("\n" + "="*60)
         print("RECORDING STARTED")
         print("="*60)
@@ -162,81 +229,113 @@ class ControllerCapture:
     def stop_recording(self):
         """Stop recording"""
         self.recording = False
+        pygame.event.set_allowed(None)
+
+        # Report notes still held as zero-length, matching notes_to_chart_arrays()
+        if self._on_note:
+            for fret_id, held in self.button_states.items():
+                if held:
+                    start = self.note_start_times[fret_id]
+                    self._on_note(fret_id, start, start)
+            self._on_note = None
         print("\n" + "="*60)
         print("RECORDING STOPPED")
         print("="*60)
-        print(f"Recorded {len(self.notes)} note events")
+        print(f"Recorded {len(self._ts)} note events")
         print("="*60 + "\n")
 
-    def process_events(self) -> bool:
+    def process_events(self, timeout_ms: int = 0) -> bool:
         """
         Process controller events during recording
         Returns False if recording should stop
+
+        Args:
+            timeout_ms: Block up to this long for the next event (0 = don't wait)
         """
         if not self.recording:
             return False
 
-        pygame.event.pump()
-
-        # Check for START button to stop (button 7 on most controllers)
-        if self.controller.get_numbuttons() > 7 and self.controller.get_button(7):
-            return False
+        if timeout_ms > 0:
+            events = [pygame.event.wait(timeout_ms)]
+            events.extend(pygame.event.get())
+        else:
+            events = pygame.event.get()
 
-        current_time = time.time() - self.start_time
+        instance_id = self._instance_id
+        button_frets = self._button_frets
 
-        # Process each mapped button
-        for button_id, fret_id in self.button_mapping.items():
-            if button_id >= self.controller.get_numbuttons():
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False
+            if event.type not in _BUTTON_EVENTS or event.instance_id != instance_id:
                 continue
 
-            button_pressed = self.controller.get_button(button_id)
+            # Timestamp at event receipt, not at poll time
+            current_time = time.perf_counter() - self.start_time
+            is_down = event.type == pygame.JOYBUTTONDOWN
+
+            # START button stops recording (button 7 on most controllers)
+            if is_down and event.button == 7:
+                return False
+
+            fret_id = button_frets.get(event.button)
+            if fret_id is None:
+                continue
 
             # Note ON - button just pressed
-            if button_pressed and not self.button_states[fret_id]:
+            if is_down and not self.button_states[fret_id]:
                 self.button_states[fret_id] = True
                 self.note_start_times[fret_id] = current_time
 
                 # Record note on with velocity (can use strumming later)
-                self.notes.append((fret_id, 100, current_time, True))  # True = note on
+                self._add_event(fret_id, 100, current_time, True)
 
-                fret_names = ["GREEN", "RED", "YELLOW", "BLUE", "ORANGE"]
-                print(f"[{current_time:6.2f}s] {fret_names[fret_id]:7s} ON")
+                if self.verbose:
+                    print(f"[{current_time:6.2f}s] {_FRET_NAMES[fret_id]:7s} ON")
 
             # Note OFF - button just released
-            elif not button_pressed and self.button_states[fret_id]:
+            elif not is_down and self.button_states[fret_id]:
                 self.button_states[fret_id] = False
-                duration = current_time - self.note_start_times[fret_id]
 
                 # Record note off
-                self.notes.append((fret_id, 0, current_time, False))  # False = note off
+                self._add_event(fret_id, 0, current_time, False)
 
-                fret_names = ["GREEN", "RED", "YELLOW", "BLUE", "ORANGE"]
-                print(f"[{current_time:6.2f}s] {fret_names[fret_id]:7s} OFF (held {duration:.2f}s)")
+                if self._on_note:
+                    self._on_note(fret_id, self.note_start_times[fret_id], current_time)
+
+                if self.verbose:
+                    duration = current_time - self.note_start_times[fret_id]
+                    print(f"[{current_time:6.2f}s] {_FRET_NAMES[fret_id]:7s} OFF (held {duration:.2f}s)")
 
         return True
 
     def record_performance(self, duration: Optional[float] = None,
-                          use_custom_mapping: bool = False) -> List[Tuple[int, int, float, bool]]:
+                          use_custom_mapping: bool = False,
+                          on_note: Optional[Callable[[int, float, float], None]] = None
+                          ) -> List[Tuple[int, int, float, bool]]:
         """
         Record a performance for a specified duration or until stopped
 
         Args:
             duration: Recording duration in seconds (None = record until START pressed)
             use_custom_mapping: If True, prompt user to map buttons
+            on_note: Called as on_note(fret, start_time, end_time) when each
+                note is released, so notes can be consumed while recording
 
         Returns:
             List of note events: (fret, velocity, timestamp, is_note_on)
         """
+        self._on_note = on_note
         self.start_recording(use_custom_mapping)
 
         try:
             if duration:
-                end_time = time.time() + duration
-                while time.time() < end_time and self.process_events():
-                    time.sleep(0.01)
+                end_time = time.perf_counter() + duration
+                while time.perf_counter() < end_time and self.process_events(timeout_ms=10):
+                    pass
             else:
-                while self.process_events():
-                    time.sleep(0.01)
+                while self.process_events(timeout_ms=10):
+                    pass
 
         except KeyboardInterrupt:
             print("\n\nRecording interrupted by user")
@@ -246,61 +345,86 @@ class ControllerCapture:
 
         return self.notes
 
-    def notes_to_chart_format(self, bpm: float = 120.0, resolution: int = 192) -> List[Dict]:
+    def notes_to_chart_arrays(self, bpm: float = 120.0, resolution: int = 192) -> Dict[str, np.ndarray]:
         """
-        Convert recorded notes to Clone Hero chart format
+        Convert recorded notes to Clone Hero chart format as parallel arrays
 
         Args:
             bpm: Beats per minute
             resolution: Ticks per quarter note
 
         Returns:
-            List of chart notes with tick positions and sustains
+            Dict of equal-length 'tick', 'fret', 'sustain' and 'velocity'
+            int64 arrays, sorted by tick then fret
         """
-        if not self.notes:
-            return []
-
-        chart_notes = []
-        active_notes = {}  # Track note-on events to calculate sustain
+        if not self._ts:
+            empty = np.empty(0, dtype=np.int64)
+            return {'tick': empty, 'fret': empty, 'sustain': empty, 'velocity': empty}
 
         # Convert time to ticks
         seconds_per_beat = 60.0 / bpm
         ticks_per_second = resolution / seconds_per_beat
 
-        for fret, velocity, timestamp, is_note_on in self.notes:
-            tick = int(timestamp * ticks_per_second)
-
-            if is_note_on:
-                # Store note-on event
-                active_notes[fret] = (tick, velocity)
-            else:
-                # Note-off: create chart note with sustain
-                if fret in active_notes:
-                    start_tick, vel = active_notes[fret]
-                    sustain = tick - start_tick
-
-                    chart_notes.append({
-                        'tick': start_tick,
-                        'fret': fret,
-                        'sustain': sustain,
-                        'velocity': vel
-                    })
-
-                    del active_notes[fret]
-
-        # Handle any notes that weren't released
-        for fret, (start_tick, vel) in active_notes.items():
-            chart_notes.append({
-                'tick': start_tick,
-                'fret': fret,
-                'sustain': 0,
-                'velocity': vel
-            })
+        events = self.get_arrays()
+        ticks = (events['timestamp'] * ticks_per_second).astype(np.int64)
+        frets = events['fret'].astype(np.int64)
+        vels = events['velocity'].astype(np.int64)
+        is_on = events['is_note_on'].astype(bool)
+        del events  # Release the buffer views so the arrays can grow again
+
+        # Each fret alternates on/off, so the k-th off closes the k-th on.
+        # Notes still held at the end have no off event and get no sustain.
+        start_ticks, note_frets, sustains, velocities = [], [], [], []
+        for fret in np.unique(frets):
+            fret_mask = frets == fret
+            on_mask = fret_mask & is_on
+            on_ticks = ticks[on_mask]
+            off_ticks = ticks[fret_mask & ~is_on]
+
+            released = min(len(on_ticks), len(off_ticks))
+            sustain = np.zeros(len(on_ticks), dtype=np.int64)
+            sustain[:released] = off_ticks[:released] - on_ticks[:released]
+
+            start_ticks.append(on_ticks)
+            note_frets.append(np.full(len(on_ticks), fret, dtype=np.int64))
+            sustains.append(sustain)
+            velocities.append(vels[on_mask])
+
+        start_ticks = np.concatenate(start_ticks)
+        note_frets = np.concatenate(note_frets)
+        sustains = np.concatenate(sustains)
+        velocities = np.concatenate(velocities)
 
         # Sort by tick
-        chart_notes.sort(key=lambda x: x['tick'])
+        order = np.lexsort((note_frets, start_ticks))
+
+        return {
+            'tick': start_ticks[order],
+            'fret': note_frets[order],
+            'sustain': sustains[order],
+            'velocity': velocities[order],
+        }
+
+    def notes_to_chart_format(self, bpm: float = 120.0, resolution: int = 192) -> List[Dict]:
+        """
+        Convert recorded notes to Clone Hero chart format
+
+        Args:
+            bpm: Beats per minute
+            resolution: Ticks per quarter note
+
+        Returns:
+            List of chart notes with tick positions and sustains
+        """
+        arrays = self.notes_to_chart_arrays(bpm, resolution)
 
-        return chart_notes
+        return [
+            {'tick': tick, 'fret': fret, 'sustain': sustain, 'velocity': vel}
+            for tick, fret, sustain, vel in zip(
+                arrays['tick'].tolist(), arrays['fret'].tolist(),
+                arrays['sustain'].tolist(), arrays['velocity'].tolist()
+            )
+        ]
 
     def cleanup(self):
         """Cleanup pygame resources"""
@@ -316,7 +440,7 @@ def main():
     print("CLONE HERO CONTROLLER CAPTURE")
     print("="*60)
 
-    capture = ControllerCapture()
+    capture = ControllerCapture(verbose=True)
 
     # List controllers
     controllers = capture.list_controllers()
@@ -364,8 +488,7 @@ def main():
         # Show sample
         print("\nSample chart notes:")
         for i, note in enumerate(chart_notes[:10]):
-            fret_names = ["GREEN", "RED", "YELLOW", "BLUE", "ORANGE"]
-            print(f"  Tick {note['tick']:5d}: {fret_names[note['fret']]:7s} "
+            print(f"  Tick {note['tick']:5d}: {_FRET_NAMES[note['fret']]:7s} "
                   f"(sustain: {note['sustain']} ticks)")
 
         if len(chart_notes) > 10:
@@ -3,6 +3,7 @@ Controller-Based Chart Editor
 Edit Clone Hero charts using your guitar controller!
 """
 
+import numpy as np
 import pygame
 import sys
 import time
@@ -19,6 +20,8 @@ class ControllerChartEditor:
     WINDOW_HEIGHT = 720
     HIGHWAY_WIDTH = 500
     HIGHWAY_X = (WINDOW_WIDTH - HIGHWAY_WIDTH) // 2
+    LANE_WIDTH = HIGHWAY_WIDTH // 5
+    LANE_CENTERS = tuple(range(HIGHWAY_X + LANE_WIDTH // 2, HIGHWAY_X + HIGHWAY_WIDTH, LANE_WIDTH))[:5]
     HIGHWAY_TOP = 100
     HIGHWAY_BOTTOM = WINDOW_HEIGHT - 100
     RECEPTOR_Y = HIGHWAY_BOTTOM - 100
@@ -32,33 +35,52 @@ class ControllerChartEditor:
         3: (30, 144, 255),   # Blue
         4: (255, 140, 0)     # Orange
     }
+    NOTE_COLORS_DIM = {lane: tuple(int(c * 0.6) for c in color) for lane, color in NOTE_COLORS.items()}
     PIXELS_PER_SECOND = 200
+    NOTE_SIZE = 50
+    RECEPTOR_SIZE = 60
+    TEXT_CACHE_SIZE = 256
 
     def __init__(self, chart_path):
         self.chart_path = Path(chart_path)
         pygame.init()
-        self.screen = pygame.display.set_mode((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
+        window_size = (self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
+        try:
+            # SCALED presents frames through SDL2's GPU renderer, which also enables vsync
+            self.screen = pygame.display.set_mode(window_size, pygame.SCALED, vsync=1)
+        except pygame.error:
+            # No accelerated renderer available, use the plain software window
+            self.screen = pygame.display.set_mode(window_size)
         pygame.display.set_caption(f"Chart Editor - {self.chart_path.stem}")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self._build_background()
+        self._build_sprites()
+        self._text_cache = {}
+        self._build_help_overlay()
 
         self.parser = ChartParser()
-        self.chart = self.parser.parse_file(str(self.chart_path))
+        self.chart = self.parser.parse_file_cached(str(self.chart_path))
         self.bpm = self.chart.get('Song', {}).get('Resolution', 120)
         self.resolution = self.chart.get('Song', {}).get('Resolution', 192)
 
         self.notes: List[ChartNote] = []
         self.load_notes()
         self.notes.sort(key=lambda n: n.position)
+        # Columnar copies of the sorted notes, index-aligned with self.notes
+        self._positions = np.fromiter((n.position for n in self.notes), dtype=np.int64, count=len(self.notes))
+        self._frets = np.fromiter((n.fret for n in self.notes), dtype=np.int8, count=len(self.notes))
+        self._sustains = np.fromiter((n.sustain for n in self.notes), dtype=np.int32, count=len(self.notes))
 
         self.playing = False
         self.current_time = 0.0
         self.edit_mode = True
         self.snap_division = 16
-        self.last_button_states = [False] * 5
+        self._last_button_mask = 0  # Bit n set while fret lane n is held
         self.modified = False
         self.show_help = True
+        self._dirty = True  # Redraw needed; the screen is static otherwise
 
         self.controller = ControllerCapture()
         if not self.controller.detect_controller():
@@ -69,7 +91,8 @@ class ControllerChartEditor:
             track = self.chart.get(track_name, {})
             notes = track.get('notes', [])
             if notes:
-                self.notes = notes
+                # parse_file_cached() shares its chart; edit a private copy
+                self.notes = list(notes)
                 self.current_difficulty = track_name
                 return
         self.notes = []
@@ -93,60 +116,113 @@ class ControllerChartEditor:
         pixels_from_receptor = time_diff * self.PIXELS_PER_SECOND
         return self.RECEPTOR_Y - pixels_from_receptor
 
-    def draw_highway(self):
+    def positions_to_y(self, positions: np.ndarray) -> np.ndarray:
+        """Vectorized position_to_y for an array of tick positions"""
+        note_times = positions / self.resolution / self.bpm * 60.0
+        return self.RECEPTOR_Y - (note_times - self.current_time) * self.PIXELS_PER_SECOND
+
+    def draw_highway(self, surface=None):
+        if surface is None:
+            surface = self.screen
+
         highway_rect = pygame.Rect(self.HIGHWAY_X, self.HIGHWAY_TOP,
                                    self.HIGHWAY_WIDTH, self.HIGHWAY_BOTTOM - self.HIGHWAY_TOP)
-        pygame.draw.rect(self.screen, self.HIGHWAY_COLOR, highway_rect)
+        pygame.draw.rect(surface, self.HIGHWAY_COLOR, highway_rect)
 
-        lane_width = self.HIGHWAY_WIDTH // 5
         for i in range(1, 5):
-            x = self.HIGHWAY_X + (i * lane_width)
-            pygame.draw.line(self.screen, (60, 60, 60), (x, self.HIGHWAY_TOP), (x, self.HIGHWAY_BOTTOM), 2)
+            x = self.HIGHWAY_X + (i * self.LANE_WIDTH)
+            pygame.draw.line(surface, (60, 60, 60), (x, self.HIGHWAY_TOP), (x, self.HIGHWAY_BOTTOM), 2)
 
-        pygame.draw.line(self.screen, (255, 255, 255),
+        pygame.draw.line(surface, (255, 255, 255),
                         (self.HIGHWAY_X, self.RECEPTOR_Y),
                         (self.HIGHWAY_X + self.HIGHWAY_WIDTH, self.RECEPTOR_Y), 3)
 
-    def draw_receptors(self, button_states):
-        lane_width = self.HIGHWAY_WIDTH // 5
-        receptor_size = 60
-
-        for lane in range(5):
-            x = self.HIGHWAY_X + (lane * lane_width) + (lane_width // 2)
-            y = self.RECEPTOR_Y
-
-            if button_states[lane]:
-                color = self.NOTE_COLORS[lane]
-                size = receptor_size + 10
-            else:
-                color = tuple(int(c * 0.6) for c in self.NOTE_COLORS[lane])
-                size = receptor_size
-
-            pygame.draw.circle(self.screen, color, (x, y), size // 2)
-            pygame.draw.circle(self.screen, (255, 255, 255), (x, y), size // 2, 3)
+    def _build_background(self):
+        """Bake the window background and static highway into one opaque surface"""
+        background = pygame.Surface((self.WINDOW_WIDTH, self.WINDOW_HEIGHT)).convert()
+        background.fill(self.BG_COLOR)
+        self.draw_highway(background)
+        self._bg = background
+
+    @staticmethod
+    def _make_circle_sprite(color, size: int) -> pygame.Surface:
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        center = (size // 2, size // 2)
+        pygame.draw.circle(surface, color, center, size // 2)
+        pygame.draw.circle(surface, (255, 255, 255), center, size // 2, 3)
+        # Match the display pixel format so blits skip per-frame conversion
+        return surface.convert_alpha()
+
+    def _build_sprites(self):
+        """Pre-render note heads and receptors so frames only blit them"""
+        self._note_sprites = {
+            lane: self._make_circle_sprite(color, self.NOTE_SIZE)
+            for lane, color in self.NOTE_COLORS.items()
+        }
+        # (released, pressed) variants per lane
+        self._receptor_sprites = {
+            lane: (
+                self._make_circle_sprite(self.NOTE_COLORS_DIM[lane], self.RECEPTOR_SIZE),
+                self._make_circle_sprite(color, self.RECEPTOR_SIZE + 10)
+            )
+            for lane, color in self.NOTE_COLORS.items()
+        }
+
+    def draw_receptors(self, button_mask: int):
+        blit_list = []
+        y = self.RECEPTOR_Y
+
+        for lane, x in enumerate(self.LANE_CENTERS):
+            sprite = self._receptor_sprites[lane][(button_mask >> lane) & 1]
+            half = sprite.get_width() // 2
+            blit_list.append((sprite, (x - half, y - half)))
+
+        self.screen.blits(blit_list, doreturn=0)
 
     def draw_notes(self):
-        lane_width = self.HIGHWAY_WIDTH // 5
-        note_size = 50
-
-        for note in self.notes:
-            y = self.position_to_y(note.position)
+        lane_centers = self.LANE_CENTERS
+        half = self.NOTE_SIZE // 2
+        blit_list = []
+
+        # Only notes whose head lies within the drawable band can be visible
+        earliest = self.current_time - (self.HIGHWAY_BOTTOM + 100 - self.RECEPTOR_Y) / self.PIXELS_PER_SECOND
+        latest = self.current_time + (self.RECEPTOR_Y - self.HIGHWAY_TOP + 100) / self.PIXELS_PER_SECOND
+        first = int(self._positions.searchsorted(self.time_to_position(earliest) - 1, 'left'))
+        last = int(self._positions.searchsorted(self.time_to_position(latest) + 1, 'right'))
+
+        visible_positions = self._positions[first:last]
+        visible_sustains = self._sustains[first:last]
+        ys = self.positions_to_y(visible_positions).tolist()
+        end_ys = self.positions_to_y(visible_positions + visible_sustains).tolist()
+
+        for lane, sustain, y, sustain_end_y in zip(self._frets[first:last].tolist(),
+                                                   visible_sustains.tolist(), ys, end_ys):
             if y < self.HIGHWAY_TOP - 100 or y > self.HIGHWAY_BOTTOM + 100:
                 continue
 
-            lane = note.fret
-            x = self.HIGHWAY_X + (lane * lane_width) + (lane_width // 2)
+            x = lane_centers[lane]
 
-            if note.sustain > 0:
-                sustain_end_y = self.position_to_y(note.position + note.sustain)
+            if sustain > 0:
                 sustain_end_y = max(sustain_end_y, self.HIGHWAY_TOP)
                 if sustain_end_y < y:
                     tail_rect = pygame.Rect(x - 15, sustain_end_y, 30, y - sustain_end_y)
                     pygame.draw.rect(self.screen, self.NOTE_COLORS[lane], tail_rect)
                     pygame.draw.rect(self.screen, (255, 255, 255), tail_rect, 2)
 
-            pygame.draw.circle(self.screen, self.NOTE_COLORS[lane], (int(x), int(y)), note_size // 2)
-            pygame.draw.circle(self.screen, (255, 255, 255), (int(x), int(y)), note_size // 2, 3)
+            blit_list.append((self._note_sprites[lane], (int(x) - half, int(y) - half)))
+
+        # Heads go on top of all sustain tails in one batched call
+        self.screen.blits(blit_list, doreturn=0)
+
+    def _render_cached(self, text: str, font: pygame.font.Font, color) -> pygame.Surface:
+        """Render text once and reuse the surface while the string is unchanged"""
+        key = (text, color, id(font))
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= self.TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = self._text_cache[key] = font.render(text, True, color).convert_alpha()
+        return surface
 
     def draw_ui(self):
         texts = [
@@ -155,15 +231,15 @@ class ControllerChartEditor:
             (f"Notes: {len(self.notes)}", (10, 70))
         ]
         for text, pos in texts:
-            surface = self.small_font.render(text, True, (255, 255, 255))
+            surface = self._render_cached(text, self.small_font, (255, 255, 255))
             self.screen.blit(surface, pos)
 
         if self.modified:
-            mod_text = self.small_font.render("* MODIFIED *", True, (255, 100, 100))
+            mod_text = self._render_cached("* MODIFIED *", self.small_font, (255, 100, 100))
             self.screen.blit(mod_text, (10, 100))
 
-        mode_text = self.font.render("EDIT MODE" if self.edit_mode else "PLAYTHROUGH", True,
-                                     (100, 255, 100) if self.edit_mode else (100, 100, 255))
+        mode_text = self._render_cached("EDIT MODE" if self.edit_mode else "PLAYTHROUGH", self.font,
+                                        (100, 255, 100) if self.edit_mode else (100, 100, 255))
         mode_rect = mode_text.get_rect()
         mode_rect.topright = (self.WINDOW_WIDTH - 10, 10)
         self.screen.blit(mode_text, mode_rect)
@@ -171,13 +247,10 @@ class ControllerChartEditor:
         if self.show_help:
             self.draw_help()
 
-    def draw_help(self):
-        overlay = pygame.Surface((600, 300))
-        overlay.set_alpha(230)
+    def _build_help_overlay(self):
+        """Bake the static help panel into one translucent surface"""
+        overlay = pygame.Surface((600, 300)).convert()
         overlay.fill((30, 30, 30))
-        overlay_rect = overlay.get_rect()
-        overlay_rect.center = (self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2)
-        self.screen.blit(overlay, overlay_rect)
 
         help_lines = [
             "CONTROLLER CHART EDITOR", "",
@@ -187,103 +260,155 @@ class ControllerChartEditor:
             "H: Hide help | ESC: Save & exit"
         ]
 
-        y = overlay_rect.top + 30
+        y = 30
         for line in help_lines:
             text = self.small_font.render(line, True, (255, 255, 255))
             text_rect = text.get_rect()
-            text_rect.centerx = self.WINDOW_WIDTH // 2
+            text_rect.centerx = overlay.get_width() // 2
             text_rect.top = y
-            self.screen.blit(text, text_rect)
+            overlay.blit(text, text_rect)
             y += 35
 
+        overlay.set_alpha(230)
+        self._help_overlay = overlay
+        self._help_overlay_rect = overlay.get_rect(center=(self.WINDOW_WIDTH // 2, self.WINDOW_HEIGHT // 2))
+
+    def draw_help(self):
+        self.screen.blit(self._help_overlay, self._help_overlay_rect)
+
     def toggle_note(self, lane: int):
         position = self.time_to_position(self.current_time)
         position = self.snap_position(position)
         snap_tolerance = self.resolution // (self.snap_division * 2)
 
-        for i, note in enumerate(self.notes):
-            if note.fret == lane and abs(note.position - position) <= snap_tolerance:
-                self.notes.pop(i)
-                self.modified = True
-                return
+        # Only notes within the snap window can match
+        lo = int(self._positions.searchsorted(position - snap_tolerance, 'left'))
+        hi = int(self._positions.searchsorted(position + snap_tolerance, 'right'))
+        matches = np.flatnonzero(self._frets[lo:hi] == lane)
+        if matches.size:
+            i = lo + int(matches[0])
+            self.notes.pop(i)
+            self._positions = np.delete(self._positions, i)
+            self._frets = np.delete(self._frets, i)
+            self._sustains = np.delete(self._sustains, i)
+            self.modified = True
+            self._dirty = True
+            return
 
         new_note = ChartNote(position=position, fret=lane, sustain=0)
-        self.notes.append(new_note)
-        self.notes.sort(key=lambda n: n.position)
+        index = int(self._positions.searchsorted(position, 'right'))
+        self.notes.insert(index, new_note)
+        self._positions = np.insert(self._positions, index, position)
+        self._frets = np.insert(self._frets, index, lane)
+        self._sustains = np.insert(self._sustains, index, 0)
         self.modified = True
+        self._dirty = True
 
-    def handle_controller_input(self):
+    def handle_controller_input(self) -> int:
+        """Poll the controller; returns the held frets as a bitmask (bit n = lane n)"""
         if not self.controller.controller:
-            return [False] * 5
+            return 0
 
         controller = self.controller.controller
         button_mapping = self.controller.get_guitar_button_mapping()
-        current_button_states = [False] * 5
+        num_buttons = controller.get_numbuttons()
+        button_mask = 0
 
         for btn_idx, lane in button_mapping.items():
-            if btn_idx < controller.get_numbuttons():
-                current_button_states[lane] = controller.get_button(btn_idx)
+            if btn_idx < num_buttons and controller.get_button(btn_idx):
+                button_mask |= 1 << lane
 
-        if self.edit_mode:
-            for lane in range(5):
-                if current_button_states[lane] and not self.last_button_states[lane]:
-                    self.toggle_note(lane)
+        if button_mask != self._last_button_mask:
+            self._dirty = True  # Receptors changed
 
-        self.last_button_states = current_button_states
+            if self.edit_mode:
+                # Toggle a note for each newly pressed fret, lowest lane first
+                pressed = button_mask & ~self._last_button_mask
+                while pressed:
+                    lowest = pressed & -pressed
+                    self.toggle_note(lowest.bit_length() - 1)
+                    pressed ^= lowest
+
+        self._last_button_mask = button_mask
 
         if controller.get_numhats() > 0:
             hat = controller.get_hat(0)
             if hat[1] > 0:
                 self.current_time = max(0, self.current_time - 0.1)
+                self._dirty = True
             elif hat[1] < 0:
                 self.current_time += 0.1
+                self._dirty = True
 
-        return current_button_states
+        return button_mask
 
     def save_chart(self):
-        self.chart[self.current_difficulty] = self.chart.get(self.current_difficulty, {})
-        self.chart[self.current_difficulty]['notes'] = self.notes
+        # Replace the track instead of updating it, keeping the cached chart intact
+        track = dict(self.chart.get(self.current_difficulty, {}))
+        track['notes'] = list(self.notes)
+        self.chart = {**self.chart, self.current_difficulty: track}
         self.parser.write_file(str(self.chart_path), self.chart)
         self.modified = False
+        self._dirty = True
         print(f"Chart saved to {self.chart_path}")
 
+    def _toggle_help(self):
+        self.show_help = not self.show_help
+        self._dirty = True
+
+    def _quit(self):
+        if self.modified:
+            self.save_chart()
+        self._running = False
+
+    def _seek_back(self):
+        self.current_time = max(0, self.current_time - 1.0)
+        self._dirty = True
+
+    def _seek_forward(self):
+        self.current_time += 1.0
+        self._dirty = True
+
     def run(self):
-        running = True
+        self._running = True
         last_time = time.time()
 
-        while running:
+        key_handlers = {
+            pygame.K_h: self._toggle_help,
+            pygame.K_ESCAPE: self._quit,
+            pygame.K_LEFT: self._seek_back,
+            pygame.K_RIGHT: self._seek_forward,
+        }
+
+        while self._running:
             dt = time.time() - last_time
             last_time = time.time()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    if self.modified:
-                        self.save_chart()
-                    running = False
+                    self._quit()
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_h:
-                        self.show_help = not self.show_help
-                    elif event.key == pygame.K_ESCAPE:
-                        if self.modified:
-                            self.save_chart()
-                        running = False
-                    elif event.key == pygame.K_LEFT:
-                        self.current_time = max(0, self.current_time - 1.0)
-                    elif event.key == pygame.K_RIGHT:
-                        self.current_time += 1.0
-
-            button_states = self.handle_controller_input()
+                    handler = key_handlers.get(event.key)
+                    if handler:
+                        handler()
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self._dirty = True
+
+            button_mask = self.handle_controller_input()
 
             if self.playing:
                 self.current_time += dt
 
-            self.screen.fill(self.BG_COLOR)
-            self.draw_highway()
-            self.draw_notes()
-            self.draw_receptors(button_states)
-            self.draw_ui()
+            # Nothing moves while paused, so only redraw after a change
+            if self._dirty or self.playing:
+                self.screen.blit(self._bg, (0, 0))
+                self.draw_notes()
+                self.draw_receptors(button_mask)
+                self.draw_ui()
+
+                pygame.display.flip()
+                self._dirty = False
 
-            pygame.display.flip()
             self.clock.tick(60)
 
         pygame.quit()
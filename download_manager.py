@@ -1,17 +1,22 @@
 """
 Download Manager with Queue System
-Handles sequential download processing with retry capabilities.
+Handles concurrent download processing with retry capabilities.
 """
 
 import os
 import threading
-from typing import Optional, Callable, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Callable, List
 from dataclasses import dataclass, field
 from enum import Enum
 import time
 from queue import Queue
 from chorus_api import Chart, ChorusAPI
 
+# Characters not allowed in Windows file names, mapped to '_'
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
 
 class DownloadStatus(Enum):
     """Download status states."""
@@ -41,36 +46,48 @@ class DownloadTask:
 
 class DownloadManager:
     """
-    Manages sequential chart downloads with queue system.
+    Manages chart downloads with queue system.
 
     Features:
-    - Sequential processing (one download at a time)
+    - Concurrent processing (up to max_concurrent downloads at a time)
     - Automatic retries on failure
     - Progress tracking
     - Cancellation support
     - Callback notifications
     """
 
-    def __init__(self, clone_hero_path: Optional[str] = None):
+    # Seconds the worker waits for new work before stopping
+    IDLE_TIMEOUT = 5.0
+
+    def __init__(self, clone_hero_path: Optional[str] = None, max_concurrent: int = 3):
         """
         Initialize the download manager.
 
         Args:
             clone_hero_path: Path to Clone Hero Songs directory
+            max_concurrent: Maximum number of simultaneous downloads
         """
         self.clone_hero_path = clone_hero_path or self._get_default_ch_path()
         self.api = ChorusAPI()
+        self.max_concurrent = max_concurrent
 
         # Download queues
-        self.download_queue: List[DownloadTask] = []
-        self.retry_queue: List[DownloadTask] = []
+        self.download_queue: Deque[DownloadTask] = deque()
+        self.retry_queue: Deque[DownloadTask] = deque()
         self.completed: List[DownloadTask] = []
         self.errored: List[DownloadTask] = []
 
-        # Threading
+        # md5 -> task for everything waiting in either queue (duplicate check)
+        self._queued_tasks: Dict[str, DownloadTask] = {}
+
+        # Threading: worker_thread dispatches queued tasks to the executor
         self.worker_thread: Optional[threading.Thread] = None
         self.is_running = False
         self.lock = threading.Lock()
+        self._wake = threading.Event()  # Set when work is queued/finished or on stop()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.Semaphore(max_concurrent)  # Free download slots
+        self._active = 0  # Downloads currently running
 
         # Callbacks
         self.progress_callback: Optional[Callable[[DownloadTask], None]] = None
@@ -125,10 +142,10 @@ class DownloadManager:
 
         # Check for duplicates
         with self.lock:
-            for task in self.download_queue + self.retry_queue:
-                if task.chart.md5 == chart.md5:
-                    print(f"Chart already in queue: {chart.name}")
-                    return task
+            existing = self._queued_tasks.get(chart.md5)
+        if existing is not None:
+            print(f"Chart already in queue: {chart.name}")
+            return existing
 
         # Create download task
         task = DownloadTask(
@@ -139,6 +156,8 @@ class DownloadManager:
 
         with self.lock:
             self.download_queue.append(task)
+            self._queued_tasks[chart.md5] = task
+        self._wake.set()
 
         # Start worker if not running
         if not self.is_running:
@@ -177,6 +196,7 @@ class DownloadManager:
                 self.download_queue.remove(task)
             if task in self.retry_queue:
                 self.retry_queue.remove(task)
+            self._unqueue(task)
 
     def retry_failed(self, task: DownloadTask):
         """Retry a failed download."""
@@ -190,6 +210,8 @@ class DownloadManager:
             task.progress = 0.0
 
             self.retry_queue.append(task)
+            self._queued_tasks[task.chart.md5] = task
+        self._wake.set()
 
         # Start worker if not running
         if not self.is_running:
@@ -199,50 +221,107 @@ class DownloadManager:
         """Start the download worker thread."""
         if not self.is_running:
             self.is_running = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent,
+                    thread_name_prefix="download"
+                )
             self.worker_thread = threading.Thread(target=self._worker, daemon=True)
             self.worker_thread.start()
 
-    def stop(self):
-        """Stop the download worker thread."""
-        self.is_running = False
+    def stop(self, wait: bool = False):
+        """
+        Stop dispatching queued downloads.
+
+        Args:
+            wait: Block until in-flight downloads finish (otherwise they
+                complete in the background)
+        """
+        with self.lock:
+            self.is_running = False
+            executor, self._executor = self._executor, None
+
+        # Wake the worker whether it is waiting for work or for a free slot
+        self._wake.set()
+        self._slots.release()
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
+        # Take back the slot released above (only the worker acquires slots)
+        self._slots.acquire(blocking=False)
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
     def _worker(self):
-        """Worker thread for processing downloads."""
+        """Worker thread that hands queued tasks to the download executor."""
         while self.is_running:
-            # Get next task
+            # Clear before checking so a task queued after the check still wakes us
+            self._wake.clear()
+
+            # Wait for a free download slot
+            if not self._slots.acquire(timeout=self.IDLE_TIMEOUT):
+                continue
+
             task = self._get_next_task()
 
             if not task:
-                # No tasks, sleep and check again
-                time.sleep(0.5)
+                self._slots.release()
+                # Block until work arrives; stop once idle for IDLE_TIMEOUT.
+                # Re-check first: the clear above may have eaten stop()'s wake-up
+                if self.is_running and not self._wake.wait(timeout=self.IDLE_TIMEOUT):
+                    with self.lock:
+                        if (not self.download_queue and not self.retry_queue
+                                and not self._active):
+                            self.is_running = False
                 continue
 
-            # Process download
-            self._process_download(task)
+            with self.lock:
+                # stop() may have run while we waited for the slot
+                if self.is_running and self._executor is not None:
+                    self._active += 1
+                    self._executor.submit(self._run_task, task)
+                    continue
+
+                # Put the task back at the front so it is dispatched first on restart
+                self.retry_queue.appendleft(task)
+                self._queued_tasks[task.chart.md5] = task
+            self._slots.release()
 
         print("Download worker stopped")
 
+    def _run_task(self, task: DownloadTask):
+        """Run a download on an executor thread and free its slot."""
+        try:
+            self._process_download(task)
+        finally:
+            with self.lock:
+                self._active -= 1
+            self._slots.release()
+            # Retries may have been queued; let the dispatcher look again
+            self._wake.set()
+
     def _get_next_task(self) -> Optional[DownloadTask]:
         """Get the next task to process."""
         with self.lock:
             # Prioritize retry queue
             if self.retry_queue:
-                task = self.retry_queue.pop(0)
+                task = self.retry_queue.popleft()
+                self._unqueue(task)
                 return task
 
             # Then main queue
             if self.download_queue:
-                task = self.download_queue.pop(0)
+                task = self.download_queue.popleft()
+                self._unqueue(task)
                 return task
 
-            # No tasks, stop worker
-            if not self.download_queue and not self.retry_queue:
-                self.is_running = False
-
         return None
 
+    def _unqueue(self, task: DownloadTask):
+        """Drop a task from the duplicate index. Caller must hold self.lock."""
+        if self._queued_tasks.get(task.chart.md5) is task:
+            del self._queued_tasks[task.chart.md5]
+
     def _process_download(self, task: DownloadTask):
         """Process a single download task."""
         if task.status == DownloadStatus.CANCELLED:
@@ -271,19 +350,23 @@ class DownloadManager:
                 on_progress
             )
 
-            if success and task.status != DownloadStatus.CANCELLED:
-                # Download complete
+            if success:
+                # Download complete (unless cancelled meanwhile)
                 with self.lock:
-                    task.status = DownloadStatus.COMPLETED
-                    task.progress = 100.0
-                    self.completed.append(task)
+                    completed = task.status != DownloadStatus.CANCELLED
+                    if completed:
+                        task.status = DownloadStatus.COMPLETED
+                        task.progress = 100.0
+                        self.completed.append(task)
 
-                print(f"✓ Downloaded: {task.chart.name}")
+                # Notify outside the lock so observers can't stall the manager
+                if completed:
+                    print(f"✓ Downloaded: {task.chart.name}")
 
-                if self.completion_callback:
-                    self.completion_callback(task)
+                    if self.completion_callback:
+                        self.completion_callback(task)
 
-            elif not success:
+            else:
                 # Download failed
                 self._handle_error(task, "Download failed")
 
@@ -293,33 +376,33 @@ class DownloadManager:
 
     def _handle_error(self, task: DownloadTask, error: str):
         """Handle download error with retry logic."""
-        task.retry_count += 1
+        # Update state under the lock, snapshotting what the messages need
+        with self.lock:
+            task.retry_count += 1
+            retry_count = task.retry_count
+            retrying = retry_count < task.max_retries
+            task.error_message = error
 
-        if task.retry_count < task.max_retries:
-            # Retry
-            print(f"⚠ Download error (retry {task.retry_count}/{task.max_retries}): {task.chart.name}")
-            with self.lock:
+            if retrying:
                 task.status = DownloadStatus.QUEUED
-                task.error_message = error
                 self.retry_queue.append(task)
+                self._queued_tasks[task.chart.md5] = task
+            else:
+                task.status = DownloadStatus.ERROR
+                self.errored.append(task)
 
+        # Notify outside the lock
+        if retrying:
+            print(f"⚠ Download error (retry {retry_count}/{task.max_retries}): {task.chart.name}")
         else:
-            # Max retries reached
             print(f"✗ Download failed: {task.chart.name} - {error}")
-            with self.lock:
-                task.status = DownloadStatus.ERROR
-                task.error_message = error
-                self.errored.append(task)
 
             if self.error_callback:
                 self.error_callback(task, error)
 
     def _sanitize_filename(self, filename: str) -> str:
         """Remove invalid characters from filename."""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        return filename.strip()
+        return filename.translate(_SANITIZE_TABLE).strip()
 
     def get_queue_status(self) -> dict:
         """Get current queue status."""
@@ -329,6 +412,7 @@ class DownloadManager:
                 "retry": len(self.retry_queue),
                 "completed": len(self.completed),
                 "errored": len(self.errored),
+                "active": self._active,
                 "is_running": self.is_running
             }
 
@@ -356,9 +440,9 @@ if __name__ == "__main__":
     print("=" * 60)
 
     # Search for charts
-    api = ChorusAPI()
-    params = SearchParams(query="test", per_page=3)
-    result = api.search(params)
+    with ChorusAPI() as api:
+        params = SearchParams(query="test", per_page=3)
+        result = api.search(params)
 
     if not result.charts:
         print("No charts found for testing")
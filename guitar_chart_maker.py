@@ -3,30 +3,114 @@ Guitar Chart Maker - Create Clone Hero charts from guitar controller OR MIDI inp
 Supports Xbox 360 Xplorer and other game controllers as well as MIDI devices
 """
 
+import argparse
 import os
+import re
 import sys
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, List, Dict
 
-# Import both capture methods
-from controller_capture import ControllerCapture
-from midi_capture import MIDICapture
+# Capture backends (pygame / mido) are imported lazily by GuitarChartMaker
 from chart_generator import ChartGenerator
 
+# MIDI note number -> fret (0-4); edit here to try other note layouts
+_FRET_LUT = np.arange(128, dtype=np.int8) % 5
+
+# Characters not allowed in the output file name
+_UNSAFE_NAME_RE = re.compile(r'[^\w -]')
+
+# Set GCM_DEBUG=1 to print full tracebacks for errors
+_DEBUG = bool(os.environ.get('GCM_DEBUG'))
+
+# Section banners for console output
+_BANNER = "=" * 60
+_BANNER_NL = "\n" + _BANNER
+
+
+def _write_lines(*lines: str):
+    """Print several lines with a single write to stdout"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _print_traceback():
+    """Print the current exception's traceback when debugging is enabled"""
+    if _DEBUG:
+        import traceback
+        traceback.print_exc()
+    else:
+        print("  (set GCM_DEBUG=1 for traceback)")
+
+
+def _print_devices(devices: List[str]):
+    """Print an indexed device listing in one write (nothing if empty)"""
+    if devices:
+        _write_lines(*(f"  [{i}] {d}" for i, d in enumerate(devices)))
+
 
 class GuitarChartMaker:
     """Unified chart maker supporting both game controllers and MIDI"""
 
+    # Seconds a device enumeration stays valid before list_all_devices() rescans
+    DEVICE_CACHE_TTL = 2.0
+
+    __slots__ = (
+        '_controller_capture', '_midi_capture', '_used_controller', '_used_midi',
+        'chart_generator', '_devices_cache', '_devices_cached_at',
+        '_io_pool', '_pending_write', '_pending_write_path',
+    )
+
     def __init__(self):
-        self.controller_capture = ControllerCapture()
-        self.midi_capture = MIDICapture()
+        self._controller_capture = None
+        self._midi_capture = None
+        # Which devices were actually opened, so cleanup() skips the rest
+        self._used_controller = False
+        self._used_midi = False
         self.chart_generator = ChartGenerator()
+        self._devices_cache: Optional[tuple] = None
+        self._devices_cached_at = 0.0
+
+        # Chart files are written in the background so device teardown can overlap
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._pending_write: Optional[Future] = None
+        self._pending_write_path = ""
+
+    @property
+    def controller_capture(self):
+        """Game controller capture, created (and pygame imported) on first use"""
+        if self._controller_capture is None:
+            from controller_capture import ControllerCapture
+            self._controller_capture = ControllerCapture()
+        return self._controller_capture
+
+    @property
+    def midi_capture(self):
+        """MIDI capture, created (and mido imported) on first use"""
+        if self._midi_capture is None:
+            from midi_capture import MIDICapture
+            self._midi_capture = MIDICapture()
+        return self._midi_capture
 
     def list_all_devices(self) -> tuple:
-        """List both game controllers and MIDI devices"""
-        controllers = self.controller_capture.list_controllers()
-        midi_devices = self.midi_capture.list_midi_devices()
+        """List both game controllers and MIDI devices (cached for DEVICE_CACHE_TTL seconds)"""
+        now = time.monotonic()
+        if self._devices_cache is None or now - self._devices_cached_at > self.DEVICE_CACHE_TTL:
+            controllers = self.controller_capture.list_controllers()
+            midi_devices = self.midi_capture.list_midi_devices()
+            self._devices_cache = (controllers, midi_devices)
+            self._devices_cached_at = now
 
-        return controllers, midi_devices
+        return self._devices_cache
+
+    def connect_controller(self, index: int = 0) -> bool:
+        """Connect to a game controller by index"""
+        self._used_controller = True
+        return self.controller_capture.connect_controller(index)
+
+    def refresh_devices(self):
+        """Forget the cached device lists, e.g. after a device is plugged in"""
+        self._devices_cache = None
 
     def create_chart_from_controller(self,
                                      output_path: str,
@@ -50,25 +134,14 @@ class GuitarChartMaker:
             True if successful
         """
         try:
-            # Record performance
-            print("\n" + "="*60)
-            print(f"Creating chart: {song_name} by {artist}")
-            print(f"BPM: {bpm}")
-            print("="*60)
-
-            notes = self.controller_capture.record_performance(duration, use_custom_mapping)
-
-            if not notes:
-                print("No notes recorded!")
-                return False
-
-            # Convert to chart format
-            chart_notes = self.controller_capture.notes_to_chart_format(bpm)
-
-            # Generate chart file
-            print("\nGenerating chart file...")
+            _write_lines(
+                _BANNER_NL,
+                f"Creating chart: {song_name} by {artist}",
+                f"BPM: {bpm}",
+                _BANNER
+            )
 
-            # Start chart
+            # Start the chart first so notes can be added as they are played
             self.chart_generator.start_chart(
                 song_name=song_name,
                 artist=artist,
@@ -76,26 +149,37 @@ class GuitarChartMaker:
                 tempo_bpm=bpm
             )
 
-            # Add notes
-            for note in chart_notes:
-                self.chart_generator.add_note(
-                    tick=note['tick'],
-                    fret=note['fret'],
-                    sustain=note['sustain']
-                )
+            seconds_per_beat = 60.0 / bpm
+            ticks_per_second = self.chart_generator.resolution / seconds_per_beat
+
+            def add_played_note(fret: int, start_time: float, end_time: float):
+                tick = int(start_time * ticks_per_second)
+                sustain = int(end_time * ticks_per_second) - tick
+                self.chart_generator.add_note(tick=tick, fret=fret, sustain=sustain)
 
-            # Write chart
-            self.chart_generator.write_chart(output_path)
+            # Record performance
+            self._used_controller = True
+            self.controller_capture.record_performance(
+                duration, use_custom_mapping, on_note=add_played_note
+            )
 
-            print(f"\n✓ Chart saved to: {output_path}")
-            print(f"  Total notes: {len(chart_notes)}")
+            if self.controller_capture.event_count == 0:
+                print("No notes recorded!")
+                return False
+
+            # Write chart (joined in cleanup())
+            self._write_chart_async(output_path)
+
+            _write_lines(
+                f"\nSaving chart to: {output_path}",
+                f"  Total notes: {self.chart_generator.note_count}"
+            )
 
             return True
 
         except Exception as e:
             print(f"\n✗ Error creating chart: {e}")
-            import traceback
-            traceback.print_exc()
+            _print_traceback()
             return False
 
     def create_chart_from_midi(self,
@@ -120,82 +204,169 @@ class GuitarChartMaker:
             True if successful
         """
         try:
-            print("\n" + "="*60)
-            print(f"Creating chart: {song_name} by {artist}")
-            print(f"BPM: {bpm}")
-            print("="*60)
+            _write_lines(
+                _BANNER_NL,
+                f"Creating chart: {song_name} by {artist}",
+                f"BPM: {bpm}",
+                _BANNER
+            )
+
+            # Start the chart before recording
+            self.chart_generator.start_chart(
+                song_name=song_name,
+                artist=artist,
+                charter="GuitarChartMaker",
+                tempo_bpm=bpm
+            )
 
-            # Connect to MIDI device
-            if not self.midi_capture.connect_device(midi_device_id):
+            # Look up the MIDI device by index in the (cached) list main() showed
+            midi_devices = self.list_all_devices()[1]
+            if not 0 <= midi_device_id < len(midi_devices):
+                print(f"✗ Invalid MIDI device: {midi_device_id}")
                 return False
 
             # Record MIDI
-            notes = self.midi_capture.record_performance(duration)
-
-            if not notes:
+            self._used_midi = True
+            self.midi_capture.start_recording_async(midi_devices[midi_device_id])
+            try:
+                print("Play your guitar! Press Ctrl+C to stop recording.")
+                if duration:
+                    time.sleep(duration)
+                else:
+                    while True:
+                        time.sleep(0.25)
+            except KeyboardInterrupt:
+                print("\nRecording stopped by user")
+            finally:
+                self.midi_capture.stop_recording()
+
+            if self.midi_capture.note_count == 0:
                 print("No notes recorded!")
                 return False
 
             # Generate chart
             print("\nGenerating chart file...")
 
-            self.chart_generator.start_chart(
-                song_name=song_name,
-                artist=artist,
-                charter="GuitarChartMaker",
-                tempo_bpm=bpm
-            )
+            # Convert the captured columns (seconds) to chart notes (ticks) in one pass
+            notes = self.midi_capture.get_arrays()
 
-            # Add notes from MIDI
-            for note in notes:
-                # Map MIDI note to fret (simple mapping)
-                fret = note['note'] % 5  # Map to 0-4
-                self.chart_generator.add_note(
-                    tick=note['tick'],
-                    fret=fret,
-                    sustain=note.get('sustain', 0)
-                )
+            # Map any played pitch to a fret with one table gather, then to the
+            # Expert lane note for that fret so the generator keeps every note
+            expert_green = ChartGenerator.DIFFICULTY_TRACKS["Expert"][0]
+            lane_notes = expert_green + _FRET_LUT[notes['note']].astype(np.int64)
+            ticks, frets, sustains = self.chart_generator.midi_arrays_to_chart_notes(
+                notes['start_time'], lane_notes, notes['duration'], bpm, "Expert"
+            )
+            self.chart_generator.add_notes_bulk(ticks, frets, sustains)
 
-            self.chart_generator.write_chart(output_path)
+            # Write chart (joined in cleanup())
+            self._write_chart_async(output_path)
 
-            print(f"\n✓ Chart saved to: {output_path}")
+            print(f"\nSaving chart to: {output_path}")
             return True
 
         except Exception as e:
             print(f"\n✗ Error creating chart: {e}")
-            import traceback
-            traceback.print_exc()
+            _print_traceback()
             return False
 
-        finally:
-            self.midi_capture.close_device()
+    def _write_chart_async(self, output_path: str):
+        """Start writing the current chart on the I/O thread"""
+        # Report an earlier write before replacing it
+        self.wait_for_write()
+        # Write a copy so a following start_chart() can't change what is saved
+        chart = self.chart_generator.snapshot()
+        self._pending_write = self._io_pool.submit(chart.write_chart, output_path)
+        self._pending_write_path = output_path
+
+    def wait_for_write(self) -> bool:
+        """
+        Wait for a background chart write to finish
+
+        Returns:
+            False if the write failed, True otherwise
+        """
+        future, self._pending_write = self._pending_write, None
+        if future is None:
+            return True
+
+        try:
+            future.result()
+        except Exception as e:
+            print(f"\n✗ Error writing chart: {e}")
+            return False
+
+        print(f"\n✓ Chart saved to: {self._pending_write_path}")
+        return True
 
-    def cleanup(self):
-        """Cleanup resources"""
-        self.controller_capture.cleanup()
-        self.midi_capture.close_device()
+    def cleanup(self) -> bool:
+        """
+        Cleanup resources
+
+        Returns:
+            False if a pending chart write failed, True otherwise
+        """
+        # Tear devices down while the chart write is still in flight
+        try:
+            if self._used_controller:
+                self.controller_capture.cleanup()
+            if self._used_midi and self.midi_capture.recording:
+                self.midi_capture.stop_recording()
+        finally:
+            written = self.wait_for_write()
+            self._io_pool.shutdown()
+        return written
 
 
 def main():
-    """Interactive chart maker"""
-    print("="*60)
-    print("           CLONE HERO GUITAR CHART MAKER")
-    print("       Create charts from guitar controller or MIDI")
-    print("="*60)
+    """Interactive chart maker (prompts are skipped for values given as options)"""
+    parser = argparse.ArgumentParser(
+        description="Create Clone Hero charts from guitar controller or MIDI input"
+    )
+    parser.add_argument(
+        "--input", choices=["controller", "midi"],
+        help="Input method (required when stdin is not a terminal)"
+    )
+    parser.add_argument("--song", "--name", "-n", dest="song", help="Song name")
+    parser.add_argument("--artist", "-a", help="Artist name")
+    parser.add_argument("--bpm", type=float, help="Tempo in beats per minute (default 120)")
+    parser.add_argument(
+        "--duration", type=float, help="Recording length in seconds (default: until stopped)"
+    )
+    parser.add_argument("--midi-device", type=int, help="MIDI device number")
+    parser.add_argument(
+        "--mapping", choices=["default", "custom"],
+        help="Controller button mapping (default: Xbox 360 Xplorer)"
+    )
+    args = parser.parse_args()
+
+    # Without a terminal there is nobody to answer prompts
+    interactive = sys.stdin.isatty()
+    if not interactive:
+        if args.input is None:
+            parser.error("--input is required when stdin is not a terminal")
+        if args.input == "midi" and args.midi_device is None:
+            parser.error("--midi-device is required when stdin is not a terminal")
+
+    _write_lines(
+        _BANNER,
+        "           CLONE HERO GUITAR CHART MAKER",
+        "       Create charts from guitar controller or MIDI",
+        _BANNER
+    )
 
     maker = GuitarChartMaker()
+    success = False
 
     try:
         # Detect devices
         controllers, midi_devices = maker.list_all_devices()
 
         print(f"\nFound {len(controllers)} game controller(s):")
-        for i, ctrl in enumerate(controllers):
-            print(f"  [{i}] {ctrl}")
+        _print_devices(controllers)
 
         print(f"\nFound {len(midi_devices)} MIDI device(s):")
-        for i, dev in enumerate(midi_devices):
-            print(f"  [{i}] {dev}")
+        _print_devices(midi_devices)
 
         if not controllers and not midi_devices:
             print("\n✗ No input devices found!")
@@ -205,78 +376,95 @@ def main():
             return
 
         # Choose input method
-        print("\n" + "="*60)
-        print("Select input method:")
-        if controllers:
-            print("  [1] Game Controller (Xbox 360 Xplorer, etc.)")
-        if midi_devices:
-            print("  [2] MIDI Device")
-        print("="*60)
+        if args.input:
+            choice = "1" if args.input == "controller" else "2"
+        else:
+            print(_BANNER_NL)
+            print("Select input method:")
+            if controllers:
+                print("  [1] Game Controller (Xbox 360 Xplorer, etc.)")
+            if midi_devices:
+                print("  [2] MIDI Device")
+            print(_BANNER)
 
-        try:
-            choice = input("\nChoice: ").strip()
-        except (EOFError, KeyboardInterrupt):
-            print("\n\nExiting...")
-            return
+            try:
+                choice = input("\nChoice: ").strip()
+            except (EOFError, KeyboardInterrupt):
+                print("\n\nExiting...")
+                return
 
         # Get song info
-        print("\n" + "="*60)
-        print("Song Information")
-        print("="*60)
+        song_name, artist, bpm = args.song, args.artist, args.bpm
 
-        try:
-            song_name = input("Song name: ").strip() or "Untitled"
-            artist = input("Artist: ").strip() or "Unknown"
-            bpm_input = input("BPM (default 120): ").strip()
-            bpm = float(bpm_input) if bpm_input else 120.0
-        except (EOFError, KeyboardInterrupt):
-            print("\n\nExiting...")
-            return
-        except ValueError:
-            print("Invalid BPM, using 120")
-            bpm = 120.0
+        if interactive and None in (song_name, artist, bpm):
+            print(_BANNER_NL)
+            print("Song Information")
+            print(_BANNER)
+
+            try:
+                if song_name is None:
+                    song_name = input("Song name: ").strip()
+                if artist is None:
+                    artist = input("Artist: ").strip()
+                if bpm is None:
+                    bpm_input = input("BPM (default 120): ").strip()
+                    bpm = float(bpm_input) if bpm_input else None
+            except (EOFError, KeyboardInterrupt):
+                print("\n\nExiting...")
+                return
+            except ValueError:
+                print("Invalid BPM, using 120")
+
+        song_name = song_name or "Untitled"
+        artist = artist or "Unknown"
+        bpm = bpm or 120.0
 
         # Output file
-        safe_name = "".join(c for c in song_name if c.isalnum() or c in (' ', '-', '_'))
+        safe_name = _UNSAFE_NAME_RE.sub('', song_name)
         output_path = f"{safe_name}.chart"
 
         # Create chart based on choice
-        success = False
-
         if choice == "1" and controllers:
             # Game controller
             print("\nConnecting to game controller...")
-            if maker.controller_capture.connect_controller(0):
-                print("\nUse default button mapping for Xbox 360 Xplorer? (y/n): ", end="")
-                try:
-                    map_choice = input().strip().lower()
-                    use_default = map_choice != 'n'
-                except (EOFError, KeyboardInterrupt):
-                    print("\n\nExiting...")
-                    return
+            if maker.connect_controller(0):
+                if args.mapping or not interactive:
+                    use_default = args.mapping != "custom"
+                else:
+                    print("\nUse default button mapping for Xbox 360 Xplorer? (y/n): ", end="")
+                    try:
+                        map_choice = input().strip().lower()
+                        use_default = map_choice != 'n'
+                    except (EOFError, KeyboardInterrupt):
+                        print("\n\nExiting...")
+                        return
 
                 success = maker.create_chart_from_controller(
                     output_path=output_path,
                     song_name=song_name,
                     artist=artist,
                     bpm=bpm,
+                    duration=args.duration,
                     use_custom_mapping=not use_default
                 )
 
         elif choice == "2" and midi_devices:
             # MIDI device
-            print("\nSelect MIDI device:")
-            for i, dev in enumerate(midi_devices):
-                print(f"  [{i}] {dev}")
-
             try:
-                device_choice = int(input("\nDevice number: "))
+                if args.midi_device is not None:
+                    device_choice = args.midi_device
+                else:
+                    print("\nSelect MIDI device:")
+                    _print_devices(midi_devices)
+                    device_choice = int(input("\nDevice number: "))
+
                 success = maker.create_chart_from_midi(
                     midi_device_id=device_choice,
                     output_path=output_path,
                     song_name=song_name,
                     artist=artist,
-                    bpm=bpm
+                    bpm=bpm,
+                    duration=args.duration
                 )
             except (EOFError, KeyboardInterrupt):
                 print("\n\nExiting...")
@@ -287,23 +475,25 @@ def main():
         else:
             print("\n✗ Invalid choice!")
 
-        if success:
-            print("\n" + "="*60)
-            print("SUCCESS! Chart created!")
-            print("="*60)
-            print(f"\nChart file: {output_path}")
-            print("\nNext steps:")
-            print("  1. Add this chart to Clone Hero's songs folder")
-            print("  2. Add the song audio file (song.ogg)")
-            print("  3. Create song.ini with metadata")
-            print("  4. Play in Clone Hero!")
-            print("\n" + "="*60)
-
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
 
     finally:
-        maker.cleanup()
+        written = maker.cleanup()
+
+    if success and written:
+        _write_lines(
+            _BANNER_NL,
+            "SUCCESS! Chart created!",
+            _BANNER,
+            f"\nChart file: {output_path}",
+            "\nNext steps:",
+            "  1. Add this chart to Clone Hero's songs folder",
+            "  2. Add the song audio file (song.ogg)",
+            "  3. Create song.ini with metadata",
+            "  4. Play in Clone Hero!",
+            _BANNER_NL
+        )
 
 
 if __name__ == "__main__":
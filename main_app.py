@@ -5,20 +5,128 @@ Unified interface for all features: MIDI recording, chart editing, library manag
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import collections
+import queue
+import subprocess
+import sys
 import threading
-from typing import Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, List
 import os
+import pathlib
+
+import numpy as np
 
 from midi_capture import MIDICapture
 from chart_generator import ChartGenerator
 from chart_parser import Chart, ChartParser, Difficulty, Instrument
 from chorus_api import ChorusAPI, SearchParams, Chart as ChorusChart
-from download_manager import DownloadManager
+from download_manager import DownloadManager, DownloadTask
+
+
+# Spaces and characters not allowed in Windows/POSIX folder names -> "_"
+_PATH_TRANS = str.maketrans({c: "_" for c in ' /:?"<>|*\\\t\n'})
+
+
+# Library filter instruments, in the column order of the per-search intensity table
+_FILTER_INSTRUMENTS = ("Guitar", "Bass", "Drums", "Keys")
+
+# Library difficulty filter -> inclusive range of Chorus intensity ratings (0-6)
+_FILTER_DIFFICULTY_TIERS = {
+    "Easy": (0, 1),
+    "Medium": (2, 3),
+    "Hard": (4, 5),
+    "Expert": (6, 99),
+}
+
+
+# Results table layout: (column id, heading, width); "#0" is the tree column
+_LIBRARY_COLUMNS = (
+    ("#0", "", 50),
+    ("name", "Song", 250),
+    ("artist", "Artist", 200),
+    ("charter", "Charter", 150),
+    ("difficulty", "Difficulty", 100),
+    ("length", "Length", 80),
+)
+
+# Download queue table layout
+_QUEUE_COLUMNS = (
+    ("song", "Song", 300),
+    ("artist", "Artist", 200),
+    ("status", "Status", 100),
+    ("progress", "Progress", 100),
+)
+
+
+def _build_treeview(parent, column_spec, **options) -> ttk.Treeview:
+    """Create a Treeview and set up its headings and widths from a column spec."""
+    tree = ttk.Treeview(parent, columns=tuple(c for c, _, _ in column_spec if c != "#0"), **options)
+    for column, heading, width in column_spec:
+        tree.heading(column, text=heading)
+        tree.column(column, width=width)
+    return tree
+
+
+def _labeled_entry(parent, label: str, width: int) -> ttk.Entry:
+    """Pack a label with a full-width entry below it and return the entry."""
+    ttk.Label(parent, text=label).pack(anchor=tk.W)
+    entry = ttk.Entry(parent, width=width)
+    entry.pack(fill=tk.X, pady=(0, 10))
+    return entry
+
+
+def _yes_no(flag: bool) -> str:
+    """Format a feature flag for display."""
+    return "Yes" if flag else "No"
+
+
+def _format_chart_details(chart: ChorusChart) -> str:
+    """Multi-line description of a Chorus chart (join several with "\n\n" for a list)."""
+    return "\n".join((
+        f"Song: {chart.name}",
+        f"Artist: {chart.artist}",
+        f"Album: {chart.album}",
+        f"Genre: {chart.genre}",
+        f"Year: {chart.year}",
+        f"Charter: {chart.charter}",
+        "",
+        "Difficulties:",
+        f"  Guitar: {chart.diff_guitar}",
+        f"  Bass: {chart.diff_bass}",
+        f"  Drums: {chart.diff_drums}",
+        f"  Keys: {chart.diff_keys}",
+        "",
+        "Features:",
+        f"  Solo Sections: {_yes_no(chart.hasSoloSections)}",
+        f"  Tap Notes: {_yes_no(chart.hasTapNotes)}",
+        f"  Open Notes: {_yes_no(chart.hasOpenNotes)}",
+        f"  Video: {_yes_no(chart.hasVideoBackground)}",
+        "",
+    ))
 
 
 class CloneHeroChartMaker(tk.Tk):
     """Main application window with all features."""
 
+    # Charts downloaded at the same time
+    DOWNLOAD_CONCURRENCY = 8
+
+    # Milliseconds between download queue display refreshes
+    DOWNLOAD_POLL_MS = 100
+
+    # Milliseconds to wait for more Enter presses before searching
+    SEARCH_DEBOUNCE_MS = 250
+
+    # Notebook index of the Downloads tab
+    DOWNLOADS_TAB = 3
+
+    # Milliseconds between recording log updates
+    MIDI_LOG_POLL_MS = 100
+
+    # Lines kept in the recording log; older ones are dropped
+    MIDI_LOG_MAX_LINES = 2000
+
     def __init__(self):
         super().__init__()
 
@@ -34,8 +142,36 @@ class CloneHeroChartMaker(tk.Tk):
         # State
         self.current_chart: Optional[Chart] = None
         self.is_recording = False
+        # (start, note, velocity, duration) from the MIDI callback thread
+        self._midi_event_queue = collections.deque(maxlen=10000)
+        # Log lines waiting for the next recording log update
+        self._log_buffer: List[str] = []
+        # Last MIDI port enumeration (None = scan on next use)
+        self._midi_devices_cache: Optional[List[str]] = None
         self.search_results: List[ChorusChart] = []
 
+        # The library table only holds the rows currently on screen
+        self._library_rows: List[tuple] = []
+        # Result indices passing the instrument/difficulty filters, in display order
+        self._library_view: List[int] = []
+        # Per-result intensity for each _FILTER_INSTRUMENTS column (-1 = not charted)
+        self._library_diffs = np.empty((0, len(_FILTER_INSTRUMENTS)), dtype=np.int16)
+        self._library_offset = 0
+        self._library_visible_rows = 20
+        self._library_selected: set = set()
+
+        # Chorus searches run here so the UI stays responsive during requests
+        self._search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chorus-search")
+        self._library_search_id = 0
+        self._search_after_id: Optional[str] = None
+
+        # Clone Hero Songs folder last checked, and the text it was checked for
+        self._validated_ch_path: Optional[pathlib.Path] = None
+        self._ch_path_text: Optional[str] = None
+
+        # Download progress from worker threads, drained on the Tk thread
+        self._download_updates: "queue.Queue[DownloadTask]" = queue.Queue()
+
         # Setup UI
         self.create_menu()
         self.create_main_interface()
@@ -43,6 +179,8 @@ class CloneHeroChartMaker(tk.Tk):
         # Load settings
         self.load_settings()
 
+        self.after(self.MIDI_LOG_POLL_MS, self._drain_midi_log)
+
     def create_menu(self):
         """Create menu bar."""
         menubar = tk.Menu(self)
@@ -81,6 +219,10 @@ class CloneHeroChartMaker(tk.Tk):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
+        # Tab index -> (frame, builder) for tabs not built yet
+        self._lazy_tabs = {}
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
         # Tab 1: MIDI Recording
         self.create_midi_tab()
 
@@ -115,24 +257,16 @@ class CloneHeroChartMaker(tk.Tk):
         self.midi_device_combo.pack(fill=tk.X, pady=(0, 10))
 
         ttk.Button(left_panel, text="Refresh Devices",
-                  command=self.refresh_midi_devices).pack(fill=tk.X, pady=(0, 20))
+                  command=lambda: self.refresh_midi_devices(rescan=True)).pack(fill=tk.X, pady=(0, 20))
 
         # Song Metadata
         ttk.Label(left_panel, text="Song Metadata",
                  font=("Arial", 10, "bold")).pack(anchor=tk.W, pady=(0, 10))
 
-        ttk.Label(left_panel, text="Song Name:").pack(anchor=tk.W)
-        self.song_name_entry = ttk.Entry(left_panel, width=40)
-        self.song_name_entry.pack(fill=tk.X, pady=(0, 10))
-
-        ttk.Label(left_panel, text="Artist:").pack(anchor=tk.W)
-        self.artist_entry = ttk.Entry(left_panel, width=40)
-        self.artist_entry.pack(fill=tk.X, pady=(0, 10))
-
-        ttk.Label(left_panel, text="BPM:").pack(anchor=tk.W)
-        self.bpm_entry = ttk.Entry(left_panel, width=40)
+        self.song_name_entry = _labeled_entry(left_panel, "Song Name:", 40)
+        self.artist_entry = _labeled_entry(left_panel, "Artist:", 40)
+        self.bpm_entry = _labeled_entry(left_panel, "BPM:", 40)
         self.bpm_entry.insert(0, "120")
-        self.bpm_entry.pack(fill=tk.X, pady=(0, 10))
 
         ttk.Label(left_panel, text="Difficulty:").pack(anchor=tk.W)
         self.difficulty_combo = ttk.Combobox(left_panel, values=["Easy", "Medium", "Hard", "Expert"],
@@ -188,7 +322,7 @@ class CloneHeroChartMaker(tk.Tk):
         ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=(0, 5))
         self.library_search_entry = ttk.Entry(search_frame, width=50)
         self.library_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
-        self.library_search_entry.bind("<Return>", lambda e: self.search_library())
+        self.library_search_entry.bind("<Return>", lambda e: self._debounced_search())
 
         ttk.Button(search_frame, text="🔍 Search",
                   command=self.search_library).pack(side=tk.LEFT, padx=(0, 5))
@@ -205,6 +339,7 @@ class CloneHeroChartMaker(tk.Tk):
                                              state="readonly", width=15)
         self.instrument_filter.set("All")
         self.instrument_filter.pack(side=tk.LEFT, padx=(0, 10))
+        self.instrument_filter.bind("<<ComboboxSelected>>", self._apply_library_filters)
 
         ttk.Label(filter_frame, text="Difficulty:").pack(side=tk.LEFT, padx=(0, 5))
         self.diff_filter = ttk.Combobox(filter_frame,
@@ -212,35 +347,35 @@ class CloneHeroChartMaker(tk.Tk):
                                        state="readonly", width=15)
         self.diff_filter.set("All")
         self.diff_filter.pack(side=tk.LEFT)
+        self.diff_filter.bind("<<ComboboxSelected>>", self._apply_library_filters)
 
         # Results
         results_panel = ttk.LabelFrame(container, text="Search Results", padding=10)
         results_panel.pack(fill=tk.BOTH, expand=True)
 
         # Results table
-        columns = ("name", "artist", "charter", "difficulty", "length")
-        self.library_tree = ttk.Treeview(results_panel, columns=columns, show="tree headings", height=20)
-
-        self.library_tree.heading("#0", text="")
-        self.library_tree.heading("name", text="Song")
-        self.library_tree.heading("artist", text="Artist")
-        self.library_tree.heading("charter", text="Charter")
-        self.library_tree.heading("difficulty", text="Difficulty")
-        self.library_tree.heading("length", text="Length")
-
-        self.library_tree.column("#0", width=50)
-        self.library_tree.column("name", width=250)
-        self.library_tree.column("artist", width=200)
-        self.library_tree.column("charter", width=150)
-        self.library_tree.column("difficulty", width=100)
-        self.library_tree.column("length", width=80)
+        self.library_tree = _build_treeview(results_panel, _LIBRARY_COLUMNS,
+                                            show="tree headings", height=20)
 
         # Scrollbar
-        scrollbar = ttk.Scrollbar(results_panel, orient=tk.VERTICAL, command=self.library_tree.yview)
-        self.library_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar (drives the visible window over self.search_results)
+        self.library_scrollbar = ttk.Scrollbar(results_panel, orient=tk.VERTICAL,
+                                               command=self._scroll_library)
+        self.library_scrollbar.set(0.0, 1.0)
+
+        self.library_tree.bind("<Configure>", self._on_library_resize)
+        self.library_tree.bind("<<TreeviewSelect>>", self._on_library_select)
+        # A plain click starts a new selection, including rows scrolled out of view;
+        # Ctrl/Shift clicks keep it (the empty bindings stop <Button-1> matching them)
+        self.library_tree.bind("<Button-1>", lambda e: self._library_selected.clear())
+        self.library_tree.bind("<Control-Button-1>", lambda e: None)
+        self.library_tree.bind("<Shift-Button-1>", lambda e: None)
+        self.library_tree.bind("<MouseWheel>", self._on_library_wheel)
+        self.library_tree.bind("<Button-4>", self._on_library_wheel)
+        self.library_tree.bind("<Button-5>", self._on_library_wheel)
 
         self.library_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.library_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Buttons
         button_frame = ttk.Frame(results_panel)
@@ -253,11 +388,29 @@ class CloneHeroChartMaker(tk.Tk):
         ttk.Button(button_frame, text="ℹ️ View Details",
                   command=self.view_chart_details).pack(side=tk.LEFT)
 
-    def create_spotify_tab(self):
-        """Create Spotify integration tab."""
+    def _add_lazy_tab(self, text: str, builder: Callable):
+        """Add an empty tab whose widgets builder(tab) creates on first use."""
         tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="🎵 Spotify Search")
+        self.notebook.add(tab, text=text)
+        self._lazy_tabs[self.notebook.index(tab)] = (tab, builder)
+
+    def _build_tab(self, index: int):
+        """Build a lazy tab's widgets if that hasn't happened yet."""
+        entry = self._lazy_tabs.pop(index, None)
+        if entry is not None:
+            tab, builder = entry
+            builder(tab)
+
+    def _on_tab_changed(self, event=None):
+        """Build the newly selected tab on first view."""
+        self._build_tab(self.notebook.index("current"))
 
+    def create_spotify_tab(self):
+        """Create Spotify integration tab (contents are built on first view)."""
+        self._add_lazy_tab("🎵 Spotify Search", self._build_spotify_tab)
+
+    def _build_spotify_tab(self, tab):
+        """Create the Spotify tab's widgets."""
         # Main container
         container = ttk.Frame(tab)
         container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -281,13 +434,8 @@ class CloneHeroChartMaker(tk.Tk):
         search_frame = ttk.LabelFrame(container, text="Manual Song Search", padding=10)
         search_frame.pack(fill=tk.X, pady=(0, 10))
 
-        ttk.Label(search_frame, text="Song Name:").pack(anchor=tk.W)
-        self.spotify_song_entry = ttk.Entry(search_frame, width=60)
-        self.spotify_song_entry.pack(fill=tk.X, pady=(0, 10))
-
-        ttk.Label(search_frame, text="Artist:").pack(anchor=tk.W)
-        self.spotify_artist_entry = ttk.Entry(search_frame, width=60)
-        self.spotify_artist_entry.pack(fill=tk.X, pady=(0, 10))
+        self.spotify_song_entry = _labeled_entry(search_frame, "Song Name:", 60)
+        self.spotify_artist_entry = _labeled_entry(search_frame, "Artist:", 60)
 
         ttk.Button(search_frame, text="🔍 Find Charts",
                   command=self.search_spotify_manual).pack()
@@ -300,10 +448,11 @@ class CloneHeroChartMaker(tk.Tk):
         self.spotify_results_text.pack(fill=tk.BOTH, expand=True)
 
     def create_downloads_tab(self):
-        """Create download manager tab."""
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="📥 Downloads")
+        """Create download manager tab (contents are built on first use)."""
+        self._add_lazy_tab("📥 Downloads", self._build_downloads_tab)
 
+    def _build_downloads_tab(self, tab):
+        """Create the download tab's widgets."""
         container = ttk.Frame(tab)
         container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
@@ -319,6 +468,7 @@ class CloneHeroChartMaker(tk.Tk):
         self.ch_path_entry = ttk.Entry(path_frame, width=70)
         self.ch_path_entry.insert(0, r"C:\Program Files\Clone Hero\Songs")
         self.ch_path_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        self.ch_path_entry.bind("<FocusOut>", self._on_ch_path_changed)
 
         ttk.Button(path_frame, text="Browse...",
                   command=self.browse_ch_folder).pack(side=tk.LEFT)
@@ -331,18 +481,7 @@ class CloneHeroChartMaker(tk.Tk):
         queue_frame.pack(fill=tk.BOTH, expand=True)
 
         # Queue list
-        columns = ("song", "artist", "status", "progress")
-        self.queue_tree = ttk.Treeview(queue_frame, columns=columns, show="headings", height=15)
-
-        self.queue_tree.heading("song", text="Song")
-        self.queue_tree.heading("artist", text="Artist")
-        self.queue_tree.heading("status", text="Status")
-        self.queue_tree.heading("progress", text="Progress")
-
-        self.queue_tree.column("song", width=300)
-        self.queue_tree.column("artist", width=200)
-        self.queue_tree.column("status", width=100)
-        self.queue_tree.column("progress", width=100)
+        self.queue_tree = _build_treeview(queue_frame, _QUEUE_COLUMNS, show="headings", height=15)
 
         scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.queue_tree.yview)
         self.queue_tree.configure(yscrollcommand=scrollbar.set)
@@ -363,10 +502,47 @@ class CloneHeroChartMaker(tk.Tk):
         self.status_bar = ttk.Label(self, text="Ready", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+    def _set_status(self, text: str):
+        """Show a message in the status bar (drawn on the next idle, never forced)."""
+        self.status_bar.config(text=text)
+
+    def _confirm(self, title: str, message: str, on_yes: Callable):
+        """
+        Ask a yes/no question without blocking the event loop.
+
+        Args:
+            title: Dialog title
+            message: Question to show
+            on_yes: Called with no arguments if the user answers Yes
+        """
+        dialog = tk.Toplevel(self)
+        dialog.title(title)
+        dialog.transient(self)
+        dialog.resizable(False, False)
+
+        ttk.Label(dialog, text=message, padding=20).pack()
+
+        def answer_yes():
+            dialog.destroy()
+            on_yes()
+
+        buttons = ttk.Frame(dialog, padding=(10, 0, 10, 10))
+        buttons.pack()
+        ttk.Button(buttons, text="Yes", command=answer_yes).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="No", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
+
     # MIDI Recording Functions
-    def refresh_midi_devices(self):
-        """Refresh MIDI device list."""
-        devices = self.midi_capture.list_midi_devices()
+    def refresh_midi_devices(self, rescan: bool = False):
+        """
+        Refresh MIDI device list.
+
+        Args:
+            rescan: Enumerate the MIDI ports again instead of reusing the last scan
+        """
+        if rescan or self._midi_devices_cache is None:
+            self._midi_devices_cache = self.midi_capture.list_midi_devices()
+        devices = self._midi_devices_cache
         self.midi_device_combo['values'] = devices if devices else ["No devices found"]
         if devices:
             self.midi_device_combo.current(0)
@@ -381,14 +557,22 @@ class CloneHeroChartMaker(tk.Tk):
                 messagebox.showerror("Error", "No MIDI devices available!")
                 return
 
-            self.is_recording = True
-            self.record_btn.config(text="⏹️ Stop Recording")
             self.log_midi("Starting recording...")
 
-            # Start recording in background thread
-            thread = threading.Thread(target=self._record_midi, args=(device_name,))
-            thread.daemon = True
-            thread.start()
+            # Notes arrive on mido's callback thread; it only queues them
+            try:
+                self.midi_capture.start_recording_async(
+                    device_name if device_name != "Use default" else None,
+                    on_note=self._queue_midi_note
+                )
+            except Exception as e:
+                self.log_midi(f"Error: {e}")
+                # The device may have been unplugged since the last scan
+                self.refresh_midi_devices(rescan=True)
+                return
+
+            self.is_recording = True
+            self.record_btn.config(text="⏹️ Stop Recording")
 
         else:
             # Stop recording
@@ -400,13 +584,31 @@ class CloneHeroChartMaker(tk.Tk):
             notes = self.midi_capture.get_notes()
             self.log_midi(f"Recording stopped. Captured {len(notes)} notes")
 
-    def _record_midi(self, device_name):
-        """Background MIDI recording."""
-        try:
-            self.midi_capture.start_recording(device_name if device_name != "Use default" else None)
-        except Exception as e:
-            self.log_midi(f"Error: {e}")
-            self.is_recording = False
+    def _queue_midi_note(self, start_time, note_number, velocity, duration):
+        """MIDI callback: hand the note to the Tk thread without touching widgets."""
+        self._midi_event_queue.append((start_time, note_number, velocity, duration))
+
+    def _drain_midi_log(self):
+        """Write the notes and messages logged since the last poll in one update."""
+        events = self._midi_event_queue
+        lines = self._log_buffer
+        while events:
+            start_time, note_number, velocity, duration = events.popleft()
+            lines.append(f"Note {note_number} at {start_time:.3f}s "
+                         f"(vel: {velocity}, duration: {duration:.3f}s)")
+
+        if lines:
+            log = self.midi_log
+            log.insert(tk.END, "\n".join(lines) + "\n")
+            lines.clear()
+
+            # Ring buffer: keep only the newest lines (the text always ends in a newline)
+            excess = int(log.index("end-1c").split(".")[0]) - 1 - self.MIDI_LOG_MAX_LINES
+            if excess > 0:
+                log.delete("1.0", f"{excess + 1}.0")
+            log.see(tk.END)
+
+        self.after(self.MIDI_LOG_POLL_MS, self._drain_midi_log)
 
     def generate_chart_from_midi(self):
         """Generate chart from recorded MIDI notes."""
@@ -425,7 +627,7 @@ class CloneHeroChartMaker(tk.Tk):
         difficulty = self.difficulty_combo.get()
 
         # Generate chart
-        output_dir = os.path.join(os.getcwd(), "output", song_name.replace(" ", "_"))
+        output_dir = os.path.join(os.getcwd(), "output", song_name.translate(_PATH_TRANS))
         os.makedirs(output_dir, exist_ok=True)
 
         chart_path = os.path.join(output_dir, "notes.chart")
@@ -452,53 +654,195 @@ class CloneHeroChartMaker(tk.Tk):
         messagebox.showinfo("Success", f"Chart created!\n\nLocation: {output_dir}\n\nAdd audio file (song.ogg) and copy to Clone Hero.")
 
     def log_midi(self, message):
-        """Log message to MIDI tab."""
-        self.midi_log.insert(tk.END, message + "\n")
-        self.midi_log.see(tk.END)
+        """Log message to MIDI tab (shown on the next log update)."""
+        self._log_buffer.append(message)
 
     # Library Functions
+    def _debounced_search(self):
+        """Search shortly after the last Enter press, so repeats cost one request."""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.SEARCH_DEBOUNCE_MS, self.search_library)
+
     def search_library(self):
         """Search Chorus library."""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+
         query = self.library_search_entry.get()
         if not query:
             messagebox.showwarning("Warning", "Please enter a search term")
             return
 
-        self.status_bar.config(text="Searching...")
-        self.update()
-
-        try:
-            params = SearchParams(query=query, per_page=50)
-            result = self.chorus_api.search(params)
-
-            # Clear previous results
-            for item in self.library_tree.get_children():
-                self.library_tree.delete(item)
-
-            # Add results
-            self.search_results = result.charts
-            for i, chart in enumerate(result.charts):
-                length_str = f"{chart.song_length // 60}:{chart.song_length % 60:02d}"
-                diff_str = f"G:{chart.diff_guitar} D:{chart.diff_drums}"
+        self._set_status("Searching...")
+
+        # Let the previous result set be freed while the new one is fetched
+        self._clear_library_results()
+
+        # Only the newest search may fill the results table
+        self._library_search_id += 1
+        search_id = self._library_search_id
+
+        def show_results(result):
+            if search_id == self._library_search_id:
+                self._show_library_results(result)
+
+        self._run_search(SearchParams(query=query, per_page=50), show_results)
+
+    def _clear_library_results(self):
+        """Empty the library table and drop the charts it referenced."""
+        self.search_results = []
+        self._library_rows = []
+        self._library_diffs = self._library_diffs[:0]
+        self._apply_library_filters()
+
+    def _show_library_results(self, result):
+        """Fill the library table with a search result."""
+        # Format all rows once per result (kept for scrolling); only the
+        # visible ones become table items
+        charts = self.search_results = result.charts
+        lengths = np.fromiter((chart.song_length or 0 for chart in charts), dtype=np.int64, count=len(charts))
+        minutes, seconds = np.divmod(lengths, 60)
+        self._library_rows = [
+            (chart.name, chart.artist, chart.charter,
+             f"G:{chart.diff_guitar} D:{chart.diff_drums}",
+             f"{m}:{sec:02d}")
+            for chart, m, sec in zip(charts, minutes.tolist(), seconds.tolist())
+        ]
+        # Missing intensities (None from the API) become -1, i.e. "not charted"
+        self._library_diffs = np.array(
+            [tuple(-1 if diff is None else diff
+                   for diff in (chart.diff_guitar, chart.diff_bass, chart.diff_drums, chart.diff_keys))
+             for chart in charts],
+            dtype=np.int16
+        ).reshape(-1, len(_FILTER_INSTRUMENTS))
+        self._library_selected.clear()
+        self._apply_library_filters()
+
+        self._set_status(f"Found {result.total_found:,} charts ({result.search_time:.2f}s, "
+                         f"cache hit rate {self.chorus_api.cache_hit_ratio:.0%})")
+
+    def _apply_library_filters(self, event=None):
+        """Show only the results matching the instrument and difficulty filters."""
+        diffs = self._library_diffs
+        instrument = self.instrument_filter.get()
+        tier = _FILTER_DIFFICULTY_TIERS.get(self.diff_filter.get())
+
+        # Intensities of the chosen instrument, or of every instrument for "All"
+        if instrument in _FILTER_INSTRUMENTS:
+            column = _FILTER_INSTRUMENTS.index(instrument)
+            ratings = diffs[:, column:column + 1]
+        else:
+            ratings = diffs
 
-                self.library_tree.insert("", tk.END, iid=str(i),
-                                        values=(chart.name, chart.artist, chart.charter,
-                                               diff_str, length_str))
+        if tier is not None:
+            low, high = tier
+            matches = ((ratings >= low) & (ratings <= high)).any(axis=1)
+        else:
+            matches = (ratings >= 0).any(axis=1) if instrument in _FILTER_INSTRUMENTS else None
 
-            self.status_bar.config(text=f"Found {result.total_found:,} charts ({result.search_time:.2f}s)")
+        if matches is None:
+            self._library_view = list(range(len(self._library_rows)))
+        else:
+            self._library_view = np.flatnonzero(matches).tolist()
+
+        # Hidden results can't stay selected
+        self._library_selected.intersection_update(self._library_view)
+        self._library_offset = 0
+        self._render_library_window()
+
+    def _render_library_window(self):
+        """Show the filtered rows from _library_offset that fit in the table."""
+        view = self._library_view
+        count = len(view)
+        visible = self._library_visible_rows
+        offset = self._library_offset = max(0, min(self._library_offset, count - visible))
+        end = min(offset + visible, count)
+
+        # Clear the old window in one call; item ids stay the result index
+        tree = self.library_tree
+        tree.delete(*tree.get_children())
+
+        insert = tree.insert
+        rows = self._library_rows
+        shown = view[offset:end]
+        for i in shown:
+            insert("", tk.END, iid=str(i), values=rows[i])
+
+        tree.selection_set([str(i) for i in shown if i in self._library_selected])
+
+        if count:
+            self.library_scrollbar.set(offset / count, end / count)
+        else:
+            self.library_scrollbar.set(0.0, 1.0)
 
+    def _scroll_library(self, action, amount, unit=None):
+        """Scrollbar command: move the visible window."""
+        if action == "moveto":
+            offset = int(float(amount) * len(self._library_view))
+        else:
+            step = self._library_visible_rows if unit == "pages" else 1
+            offset = self._library_offset + int(amount) * step
+
+        if offset != self._library_offset:
+            self._library_offset = offset
+            self._render_library_window()
+
+    def _on_library_wheel(self, event):
+        """Scroll the library table with the mouse wheel."""
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_library("scroll", -3 if up else 3, "units")
+        return "break"
+
+    def _on_library_resize(self, event):
+        """Fit the number of materialized rows to the table's height."""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # One row's worth of height is taken by the headings
+        rows = max(1, event.height // row_height - 1)
+        if rows != self._library_visible_rows:
+            self._library_visible_rows = rows
+            self._render_library_window()
+
+    def _on_library_select(self, event=None):
+        """Remember selections by result index so they survive scrolling."""
+        tree = self.library_tree
+        selected = tree.selection()
+        for iid in tree.get_children():
+            if iid in selected:
+                self._library_selected.add(int(iid))
+            else:
+                self._library_selected.discard(int(iid))
+
+    def _run_search(self, params: SearchParams, on_result: Callable):
+        """
+        Run a Chorus search on a worker thread.
+
+        Args:
+            params: Search parameters
+            on_result: Called on the Tk thread with the SearchResult
+        """
+        future = self._search_pool.submit(self.chorus_api.search, params)
+        future.add_done_callback(lambda f: self.after(0, self._finish_search, f, on_result))
+
+    def _finish_search(self, future: Future, on_result: Callable):
+        """Deliver a finished search to its handler, or report the error."""
+        try:
+            result = future.result()
         except Exception as e:
             messagebox.showerror("Error", f"Search failed: {e}")
-            self.status_bar.config(text="Search failed")
+            self._set_status("Search failed")
+            return
+
+        on_result(result)
 
     def download_selected_charts(self):
         """Download selected charts from library."""
-        selection = self.library_tree.selection()
-        if not selection:
+        if not self._library_selected:
             messagebox.showwarning("Warning", "Please select charts to download")
             return
 
-        charts = [self.search_results[int(item)] for item in selection]
+        charts = [self.search_results[i] for i in sorted(self._library_selected)]
         self._download_charts(charts)
 
     def download_all_results(self):
@@ -507,31 +851,55 @@ class CloneHeroChartMaker(tk.Tk):
             messagebox.showwarning("Warning", "No search results to download")
             return
 
-        if len(self.search_results) > 10:
-            if not messagebox.askyesno("Confirm", f"Download {len(self.search_results)} charts?"):
-                return
+        charts = list(self.search_results)
+        if len(charts) > 10:
+            self._confirm("Confirm", f"Download {len(charts)} charts?",
+                          lambda: self._download_charts(charts))
+            return
 
-        self._download_charts(self.search_results)
+        self._download_charts(charts)
 
     def _download_charts(self, charts):
         """Start downloading charts."""
-        ch_path = self.ch_path_entry.get()
-        if not os.path.isdir(ch_path):
+        self._build_tab(self.DOWNLOADS_TAB)
+        ch_path = self._validate_ch_path()
+        if ch_path is None:
             messagebox.showerror("Error", "Invalid Clone Hero path")
             return
 
         if not self.download_manager:
-            self.download_manager = DownloadManager(ch_path)
-
-        for chart in charts:
-            task = self.download_manager.add_download(chart, include_video=False)
+            self.download_manager = DownloadManager(str(ch_path), max_concurrent=self.DOWNLOAD_CONCURRENCY)
+            self.download_manager.progress_callback = self._download_updates.put
+            self.download_manager.completion_callback = self._download_updates.put
+            self.download_manager.error_callback = lambda task, error: self._download_updates.put(task)
+            self.after(self.DOWNLOAD_POLL_MS, self._poll_download_updates)
+
+        for task in self.download_manager.add_multiple(charts, include_video=False):
+            # Add to queue display (rows are keyed by chart hash)
+            chart = task.chart
+            if not self.queue_tree.exists(chart.md5):
+                self.queue_tree.insert("", tk.END, iid=chart.md5,
+                                      values=(chart.name, chart.artist, "Queued", "0%"))
+
+        self.notebook.select(self.DOWNLOADS_TAB)
+        self._set_status(f"Added {len(charts)} chart(s) to download queue")
+
+    def _poll_download_updates(self):
+        """Show the latest state of each download that changed since the last poll."""
+        latest = {}
+        try:
+            while True:
+                task = self._download_updates.get_nowait()
+                latest[task.chart.md5] = task
+        except queue.Empty:
+            pass
 
-            # Add to queue display
-            self.queue_tree.insert("", tk.END,
-                                  values=(chart.name, chart.artist, "Queued", "0%"))
+        for iid, task in latest.items():
+            if self.queue_tree.exists(iid):
+                self.queue_tree.set(iid, "status", task.status.value.capitalize())
+                self.queue_tree.set(iid, "progress", f"{task.progress:.0f}%")
 
-        self.notebook.select(3)  # Switch to downloads tab
-        messagebox.showinfo("Success", f"Added {len(charts)} chart(s) to download queue")
+        self.after(self.DOWNLOAD_POLL_MS, self._poll_download_updates)
 
     # Spotify Functions
     def search_spotify_manual(self):
@@ -545,21 +913,22 @@ class CloneHeroChartMaker(tk.Tk):
 
         # Search using Chorus API
         query = f"{song} {artist}".strip()
-        try:
-            params = SearchParams(query=query, per_page=10)
-            result = self.chorus_api.search(params)
+        self._set_status("Searching...")
+        self._run_search(SearchParams(query=query, per_page=10),
+                         lambda result: self._show_spotify_results(query, result))
 
-            self.spotify_results_text.delete(1.0, tk.END)
-            self.spotify_results_text.insert(tk.END, f"Found {result.total_found} charts for '{query}':\n\n")
+    def _show_spotify_results(self, query: str, result):
+        """Show manual search matches in the Spotify tab."""
+        self.spotify_results_text.delete(1.0, tk.END)
+        self.spotify_results_text.insert(tk.END, f"Found {result.total_found} charts for '{query}':\n\n")
 
-            for chart in result.charts[:10]:
-                self.spotify_results_text.insert(tk.END,
-                    f"🎸 {chart.name} - {chart.artist}\n" +
-                    f"   Charter: {chart.charter}\n" +
-                    f"   Difficulty: Guitar:{chart.diff_guitar} Bass:{chart.diff_bass} Drums:{chart.diff_drums}\n\n")
+        for chart in result.charts[:10]:
+            self.spotify_results_text.insert(tk.END,
+                f"🎸 {chart.name} - {chart.artist}\n" +
+                f"   Charter: {chart.charter}\n" +
+                f"   Difficulty: Guitar:{chart.diff_guitar} Bass:{chart.diff_bass} Drums:{chart.diff_drums}\n\n")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {e}")
+        self._set_status("Ready")
 
     # Helper Functions
     def browse_ch_folder(self):
@@ -568,6 +937,31 @@ class CloneHeroChartMaker(tk.Tk):
         if folder:
             self.ch_path_entry.delete(0, tk.END)
             self.ch_path_entry.insert(0, folder)
+            self._on_ch_path_changed()
+
+    def _validate_ch_path(self) -> Optional[pathlib.Path]:
+        """
+        Check the Clone Hero Songs folder entry, reusing the last result if unchanged.
+
+        Returns:
+            The folder as a Path, or None if it is not a readable directory
+        """
+        text = self.ch_path_entry.get()
+        if text != self._ch_path_text:
+            self._ch_path_text = text
+            try:
+                # One call confirms it is a directory we can list
+                with os.scandir(text) as entries:
+                    next(entries, None)
+                self._validated_ch_path = pathlib.Path(text)
+            except OSError:
+                self._validated_ch_path = None
+        return self._validated_ch_path
+
+    def _on_ch_path_changed(self, event=None):
+        """Validate the Songs folder as soon as it is edited or browsed to."""
+        if self._validate_ch_path() is None:
+            self._set_status("Clone Hero Songs folder not found")
 
     def show_advanced_search(self):
         """Show advanced search dialog."""
@@ -580,24 +974,7 @@ class CloneHeroChartMaker(tk.Tk):
             return
 
         chart = self.search_results[int(selection[0])]
-        details = (
-            f"Song: {chart.name}\n"
-            f"Artist: {chart.artist}\n"
-            f"Album: {chart.album}\n"
-            f"Genre: {chart.genre}\n"
-            f"Year: {chart.year}\n"
-            f"Charter: {chart.charter}\n\n"
-            f"Difficulties:\n"
-            f"  Guitar: {chart.diff_guitar}\n"
-            f"  Bass: {chart.diff_bass}\n"
-            f"  Drums: {chart.diff_drums}\n"
-            f"  Keys: {chart.diff_keys}\n\n"
-            f"Features:\n"
-            f"  Solo Sections: {'Yes' if chart.hasSoloSections else 'No'}\n"
-            f"  Tap Notes: {'Yes' if chart.hasTapNotes else 'No'}\n"
-            f"  Open Notes: {'Yes' if chart.hasOpenNotes else 'No'}\n"
-            f"  Video: {'Yes' if chart.hasVideoBackground else 'No'}\n"
-        )
+        details = _format_chart_details(chart)
         messagebox.showinfo("Chart Details", details)
 
     # Menu Functions
@@ -614,7 +991,10 @@ class CloneHeroChartMaker(tk.Tk):
         )
         if filename:
             try:
-                self.current_chart = ChartParser.parse_file(filename)
+                chart = ChartParser.parse_file(filename)
+                if self.current_chart:
+                    self.current_chart.release_notes()
+                self.current_chart = chart
                 messagebox.showinfo("Success", f"Loaded: {self.current_chart.name}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load chart: {e}")
@@ -645,9 +1025,19 @@ class CloneHeroChartMaker(tk.Tk):
 
     def launch_visual_editor(self):
         """Launch visual editor."""
-        import subprocess
-        import sys
-        subprocess.Popen([sys.executable, "visual_editor.py"])
+        # Process creation can stall for a noticeable moment; keep it off the Tk thread
+        threading.Thread(target=self._launch_visual_editor, daemon=True).start()
+
+    def _launch_visual_editor(self):
+        """Start the visual editor process (worker thread); report failures in the GUI."""
+        script = "visual_editor.py"
+        try:
+            # A missing script would only make the child exit, so check first
+            if not os.path.isfile(script):
+                raise FileNotFoundError(f"{script} not found in {os.getcwd()}")
+            subprocess.Popen([sys.executable, script], start_new_session=True)
+        except OSError as e:
+            self.after(0, messagebox.showerror, "Error", f"Could not launch visual editor:\n{e}")
 
     def show_documentation(self):
         """Show documentation."""
@@ -699,7 +1089,11 @@ class CloneHeroChartMaker(tk.Tk):
 def main():
     """Launch main application."""
     app = CloneHeroChartMaker()
-    app.mainloop()
+    try:
+        app.mainloop()
+    finally:
+        app._search_pool.shutdown(wait=False)
+        app.chorus_api.close()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,9 @@ Captures MIDI input from a connected MIDI guitar in real-time.
 """
 
 import mido
-from typing import List, Tuple, Optional
+import numpy as np
+from array import array
+from typing import Callable, Dict, List, Tuple, Optional
 import time
 
 
@@ -13,9 +15,55 @@ class MIDICapture:
 
     def __init__(self):
         self.recording = False
-        self.notes = []  # List of (timestamp, note_number, velocity, note_off_time)
+        self._reset_notes()
         self.start_time = 0
         self.active_notes = {}  # note_number -> (start_timestamp, velocity)
+        self._port = None  # Callback-driven port opened by start_recording_async()
+        self._on_note: Optional[Callable[[float, int, int, float], None]] = None
+        self._echo = True  # Print each note; off on the async callback thread
+
+    def _reset_notes(self):
+        """Clear captured notes (stored as parallel typed arrays)"""
+        self._starts = array('d')
+        self._note_numbers = array('B')
+        self._velocities = array('B')
+        self._durations = array('d')
+
+    def _add_note(self, start_time: float, note_number: int, velocity: int, duration: float):
+        """Record one completed note"""
+        self._starts.append(start_time)
+        self._note_numbers.append(note_number)
+        self._velocities.append(velocity)
+        self._durations.append(duration)
+
+        if self._on_note:
+            self._on_note(start_time, note_number, velocity, duration)
+
+    @property
+    def notes(self) -> List[Tuple[float, int, int, float]]:
+        """Captured notes: (start_time, note_number, velocity, duration)"""
+        return list(zip(self._starts, self._note_numbers, self._velocities, self._durations))
+
+    @property
+    def note_count(self) -> int:
+        """Number of captured notes"""
+        return len(self._starts)
+
+    def get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Captured notes as zero-copy NumPy views, in capture order.
+
+        Returns:
+            Dict of parallel 'start_time' (float64), 'note' (uint8),
+            'velocity' (uint8) and 'duration' (float64) arrays, valid until
+            the next recording starts
+        """
+        return {
+            'start_time': np.frombuffer(self._starts, dtype=np.float64),
+            'note': np.frombuffer(self._note_numbers, dtype=np.uint8),
+            'velocity': np.frombuffer(self._velocities, dtype=np.uint8),
+            'duration': np.frombuffer(self._durations, dtype=np.float64),
+        }
 
     def list_midi_devices(self) -> List[str]:
         """List all available MIDI input devices."""
@@ -29,11 +77,12 @@ class MIDICapture:
             device_name: Name of MIDI device to use. If None, uses default.
         """
         self.recording = True
-        self.notes = []
+        self._reset_notes()
         self.active_notes = {}
-        self.start_time = time.time()
+        self._echo = True
+        self.start_time = time.perf_counter()
 
-        print(f"Recording started at {self.start_time}")
+        print("Recording started")
 
         try:
             if device_name:
@@ -56,20 +105,53 @@ class MIDICapture:
             port.close()
             self._finalize_active_notes()
 
+    def start_recording_async(
+        self,
+        device_name: Optional[str] = None,
+        on_note: Optional[Callable[[float, int, int, float], None]] = None
+    ):
+        """
+        Start recording MIDI input without blocking.
+
+        Messages are handled on mido's callback thread as they arrive; call
+        stop_recording() to finish.
+
+        Args:
+            device_name: Name of MIDI device to use. If None, uses default.
+            on_note: Called as on_note(start_time, note_number, velocity, duration)
+                from the callback thread when each note completes
+        """
+        self.recording = True
+        self._reset_notes()
+        self.active_notes = {}
+        self._on_note = on_note
+        # Printing would stall mido's callback thread; notes reach the caller via on_note
+        self._echo = False
+        self.start_time = time.perf_counter()
+
+        self._port = mido.open_input(device_name, callback=self._process_midi_message)
+        print(f"Listening on MIDI port: {self._port.name}")
+
     def stop_recording(self):
         """Stop recording MIDI input."""
         self.recording = False
+        if self._port is not None:
+            # Closing the port stops the callback thread before notes are finalized
+            self._port.close()
+            self._port = None
         self._finalize_active_notes()
-        print(f"Recording stopped. Captured {len(self.notes)} notes.")
+        self._on_note = None
+        print(f"Recording stopped. Captured {self.note_count} notes.")
 
     def _process_midi_message(self, msg: mido.Message):
         """Process incoming MIDI message."""
-        current_time = time.time() - self.start_time
+        current_time = time.perf_counter() - self.start_time
 
         if msg.type == 'note_on' and msg.velocity > 0:
             # Note started
             self.active_notes[msg.note] = (current_time, msg.velocity)
-            print(f"Note ON:  {msg.note} at {current_time:.3f}s (vel: {msg.velocity})")
+            if self._echo:
+                print(f"Note ON:  {msg.note} at {current_time:.3f}s (vel: {msg.velocity})")
 
         elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
             # Note ended
@@ -77,19 +159,19 @@ class MIDICapture:
                 start_time, velocity = self.active_notes[msg.note]
                 duration = current_time - start_time
 
-                # Store: (start_time, note_number, velocity, duration)
-                self.notes.append((start_time, msg.note, velocity, duration))
-                print(f"Note OFF: {msg.note} at {current_time:.3f}s (duration: {duration:.3f}s)")
+                self._add_note(start_time, msg.note, velocity, duration)
+                if self._echo:
+                    print(f"Note OFF: {msg.note} at {current_time:.3f}s (duration: {duration:.3f}s)")
 
                 del self.active_notes[msg.note]
 
     def _finalize_active_notes(self):
         """Finalize any notes that are still active when recording stops."""
-        current_time = time.time() - self.start_time
+        current_time = time.perf_counter() - self.start_time
 
         for note_number, (start_time, velocity) in self.active_notes.items():
             duration = current_time - start_time
-            self.notes.append((start_time, note_number, velocity, duration))
+            self._add_note(start_time, note_number, velocity, duration)
 
         self.active_notes = {}
 
@@ -104,10 +186,10 @@ class MIDICapture:
 
     def get_recording_duration(self) -> float:
         """Get total recording duration in seconds."""
-        if not self.notes:
+        if not self._starts:
             return 0.0
-        last_note = max(self.notes, key=lambda x: x[0] + x[3])
-        return last_note[0] + last_note[3]
+        notes = self.get_arrays()
+        return float((notes['start_time'] + notes['duration']).max())
 
 
 if __name__ == "__main__":
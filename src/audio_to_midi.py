@@ -8,13 +8,33 @@ Two-stage pipeline:
 Falls back to librosa pYIN if dependencies not available.
 """
 
+import functools
 import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Tuple
 import pretty_midi
 import tempfile
 import shutil
 
+try:
+    from numba import njit
+    _jit = njit(cache=True)
+except ImportError:  # numba is optional; the kernels then run as plain Python
+    def _jit(func):
+        return func
+
+
+@dataclass
+class SegmentedNotes:
+    """Notes from segment_notes(), stored as parallel arrays."""
+    pitches: np.ndarray  # MIDI pitch (int16)
+    starts: np.ndarray   # Start time in seconds (float64)
+    ends: np.ndarray     # End time in seconds (float64)
+
+    def __len__(self) -> int:
+        return len(self.pitches)
+
 
 def check_demucs_available() -> bool:
     """Check if demucs is installed."""
@@ -71,84 +91,154 @@ def separate_stems_demucs_api(
     Returns:
         Dict mapping stem name to file path.
     """
+    return _separate_stems([audio_path], [output_dir], stems, model)[0]
+
+
+def separate_stems_demucs_batch(
+    audio_paths: list,
+    output_dir: str,
+    stems: list = None,  # List of stems to extract, or None for all
+    model: str = 'htdemucs_6s',
+) -> list:
+    """
+    Separate several audio files in one Demucs pass.
+
+    The model is loaded once and all files run through it as a single
+    zero-padded batch, so its weights are read once per chunk for the
+    whole batch rather than once per file.
+
+    Args:
+        audio_paths: Paths to input audio files.
+        output_dir: Directory to save stems in; each input gets a
+            subdirectory named after its file (e.g. 'song/vocals.wav').
+        stems: Stems to extract, or None for all.
+        model: Demucs model to use.
+
+    Returns:
+        List of dicts mapping stem name to file path, one per input
+        (empty if separation failed).
+    """
+    output_dirs = [Path(output_dir) / Path(path).stem for path in audio_paths]
+    return _separate_stems(audio_paths, output_dirs, stems, model)
+
+
+def _demucs_device() -> str:
+    """Best available torch device name: CUDA, then MPS on Apple Silicon, then CPU."""
+    import torch
+
+    if torch.cuda.is_available():
+        return 'cuda'
+    if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+
+@functools.lru_cache(maxsize=2)
+def _get_cached_demucs(model: str, device: str):
+    """Load a Demucs model in eval mode on device, reusing it across calls."""
+    from demucs.pretrained import get_model
+
+    print(f"Loading Demucs model {model}...")
+    demucs_model = get_model(model)
+    demucs_model.eval()
+    demucs_model.to(device)
+    return demucs_model
+
+
+def _load_demucs_input(audio_path: str, target_sr: int, device: str):
+    """Load audio as a float32 (2, samples) tensor on device, resampled to target_sr."""
+    import torch
+    import soundfile as sf
+    import torchaudio.functional as AF
+
     try:
-        import torch
-        import soundfile as sf
+        y, sr = sf.read(audio_path, dtype='float32', always_2d=True)
+        y = y.T  # (channels, samples)
+    except RuntimeError:
+        # Formats libsndfile can't decode (e.g. MP3 on older builds) go through librosa
         import librosa
-        from demucs.pretrained import get_model
-        from demucs.apply import apply_model
+        y, sr = librosa.load(audio_path, sr=None, mono=False, dtype=np.float32)
+        y = np.atleast_2d(y)
 
-        print(f"Loading Demucs model {model}...")
-        demucs_model = get_model(model)
-        demucs_model.eval()
+    # Ensure stereo
+    if y.shape[0] == 1:
+        y = np.concatenate([y, y])  # Mono to stereo
+    elif y.shape[0] > 2:
+        y = y[:2]  # Take first 2 channels
 
-        # Use CPU if no CUDA, or MPS on Apple Silicon
-        if torch.cuda.is_available():
-            device = torch.device('cuda')
-        elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            device = torch.device('mps')
-        else:
-            device = torch.device('cpu')
+    wav = torch.from_numpy(np.ascontiguousarray(y)).to(device)
+    if sr != target_sr:
+        wav = AF.resample(wav, sr, target_sr)
+    return wav
 
-        demucs_model.to(device)
+
+def _separate_stems(audio_paths: list, output_dirs: list, stems: Optional[list], model: str) -> list:
+    """Run Demucs over audio_paths as one batch, saving stems to the matching output_dirs."""
+    try:
+        import torch
+        import soundfile as sf
+        from demucs.apply import apply_model
+
+        device = _demucs_device()
+        demucs_model = _get_cached_demucs(model, device)
 
         # Get the sample rate the model expects
         target_sr = demucs_model.samplerate
 
-        print(f"Loading audio from {audio_path}...")
-        # Load audio using librosa (more reliable than demucs AudioFile)
-        # Load as mono first, then duplicate to stereo
-        y, sr = librosa.load(audio_path, sr=target_sr, mono=False)
+        tracks = []
+        for audio_path in audio_paths:
+            print(f"Loading audio from {audio_path}...")
+            tracks.append(_load_demucs_input(audio_path, target_sr, device))
 
-        # Ensure stereo
-        if y.ndim == 1:
-            y = np.stack([y, y])  # Mono to stereo
-        elif y.shape[0] > 2:
-            y = y[:2]  # Take first 2 channels
-
-        # Convert to torch tensor: (channels, samples) -> (batch, channels, samples)
-        wav = torch.from_numpy(y).float().unsqueeze(0).to(device)
+        # Right-pad with silence into one (batch, channels, samples) tensor;
+        # apply_model() splits it into fixed-size chunks, each run for the whole batch
+        lengths = [y.shape[1] for y in tracks]
+        wav = torch.zeros((len(tracks), 2, max(lengths)), dtype=torch.float32, device=device)
+        for i, y in enumerate(tracks):
+            wav[i, :, :lengths[i]] = y
 
         print("Running separation (this may take a few minutes)...")
-        with torch.no_grad():
+        with torch.inference_mode():
             sources = apply_model(demucs_model, wav, device=device)
 
         # sources shape: (batch, num_sources, channels, samples)
-        sources = sources[0]  # Remove batch dimension
+        sources = sources.cpu().numpy()
 
         # Get source names from model
         source_names = demucs_model.sources
         print(f"Separated sources: {source_names}")
 
-        # Create output directory
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
         # Save each stem using soundfile (avoids torchaudio issue)
-        result = {}
         sample_rate = demucs_model.samplerate
 
         if stems is None:
             stems = source_names
 
-        for i, name in enumerate(source_names):
-            if name not in stems:
-                continue
+        results = []
+        for track_sources, length, output_dir in zip(sources, lengths, output_dirs):
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
 
-            stem_path = output_path / f'{name}.wav'
-            stem_audio = sources[i].cpu().numpy().T  # (samples, channels)
+            result = {}
+            for i, name in enumerate(source_names):
+                if name not in stems:
+                    continue
 
-            print(f"  Saving {name} to {stem_path}...")
-            sf.write(str(stem_path), stem_audio, sample_rate)
-            result[name] = str(stem_path)
+                stem_path = output_path / f'{name}.wav'
+                stem_audio = track_sources[i, :, :length].T  # (samples, channels), padding trimmed
 
-        return result
+                print(f"  Saving {name} to {stem_path}...")
+                sf.write(str(stem_path), stem_audio, sample_rate)
+                result[name] = str(stem_path)
+            results.append(result)
+
+        return results
 
     except Exception as e:
         print(f"Demucs separation failed: {e}")
         import traceback
         traceback.print_exc()
-        return {}
+        return [{} for _ in audio_paths]
 
 
 def convert_with_basic_pitch(
@@ -256,58 +346,118 @@ def hz_to_midi(freq: float) -> int:
     return int(round(69 + 12 * np.log2(freq / 440.0)))
 
 
-def segment_notes(
-    times: np.ndarray,
-    frequencies: np.ndarray,
-    voiced: np.ndarray,
-    min_note_duration: float = 0.05,
-    pitch_tolerance: int = 1,
-) -> list[dict]:
-    """Segment continuous pitch data into discrete notes."""
-    notes = []
-    current_note = None
+def hz_to_midi_array(freqs: np.ndarray, voiced: np.ndarray) -> np.ndarray:
+    """
+    Convert a pitch track in Hz to MIDI note numbers in one pass.
 
-    for i, (t, freq, is_voiced) in enumerate(zip(times, frequencies, voiced)):
-        midi_pitch = hz_to_midi(freq) if is_voiced and not np.isnan(freq) else 0
+    Args:
+        freqs: Frequency per frame in Hz (NaN for unpitched frames).
+        voiced: Voicing flag per frame.
 
-        if midi_pitch > 0:
-            if current_note is None:
-                current_note = {
-                    'start': t,
-                    'pitch': midi_pitch,
-                    'pitches': [midi_pitch],
-                }
-            elif abs(midi_pitch - current_note['pitch']) <= pitch_tolerance:
-                current_note['pitches'].append(midi_pitch)
-            else:
-                current_note['end'] = t
-                current_note['pitch'] = int(np.median(current_note['pitches']))
-                if current_note['end'] - current_note['start'] >= min_note_duration:
-                    notes.append(current_note)
-                current_note = {
-                    'start': t,
-                    'pitch': midi_pitch,
-                    'pitches': [midi_pitch],
-                }
+    Returns:
+        int16 MIDI note number per frame, 0 where unvoiced or unpitched.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    pitched = np.asarray(voiced, dtype=bool) & (freqs > 0)  # NaN fails freqs > 0
+    safe = np.where(pitched, freqs, 440.0)
+    midi = np.rint(69.0 + 12.0 * np.log2(safe / 440.0)).astype(np.int16)
+    midi[~pitched] = 0
+    return midi
+
+
+@_jit
+def _median_offset(counts, total):
+    """Median of values stored as a histogram of offsets (0..len(counts)-1), floored."""
+    # Ranks (0-based) of the two middle values; equal when total is odd
+    low_rank = (total - 1) // 2
+    high_rank = total // 2
+    low = -1
+    seen = 0
+    for offset in range(len(counts)):
+        seen += counts[offset]
+        if low < 0 and seen > low_rank:
+            low = offset
+        if seen > high_rank:
+            return (low + offset) // 2
+    return low
+
+
+@_jit
+def _segment_notes_kernel(times, midi_pitches, min_note_duration, pitch_tolerance):
+    """
+    Frame loop behind segment_notes().
+
+    Returns:
+        (starts, ends, pitches, count); only the first count entries are used.
+    """
+    n = len(times)
+    starts = np.empty(n, dtype=np.float64)
+    ends = np.empty(n, dtype=np.float64)
+    pitches = np.empty(n, dtype=np.int64)
+    count = 0
+
+    # Pitches of the current note as a histogram of offsets from its first pitch
+    counts = np.zeros(2 * pitch_tolerance + 1, dtype=np.int64)
+    in_note = False
+    note_start = 0.0
+    note_pitch = 0
+    note_frames = 0
+
+    for i in range(n + 1):
+        if i < n:
+            midi_pitch = int(midi_pitches[i])
+            t = times[i]
         else:
-            if current_note is not None:
-                current_note['end'] = t
-                current_note['pitch'] = int(np.median(current_note['pitches']))
-                if current_note['end'] - current_note['start'] >= min_note_duration:
-                    notes.append(current_note)
-                current_note = None
+            # Past the last frame: close any open note at the final time
+            midi_pitch = 0
+            t = times[n - 1]
+
+        if in_note and midi_pitch > 0 and abs(midi_pitch - note_pitch) <= pitch_tolerance:
+            counts[midi_pitch - note_pitch + pitch_tolerance] += 1
+            note_frames += 1
+            continue
+
+        if in_note:
+            if t - note_start >= min_note_duration:
+                starts[count] = note_start
+                ends[count] = t
+                pitches[count] = note_pitch - pitch_tolerance + _median_offset(counts, note_frames)
+                count += 1
+            counts[:] = 0
+            in_note = False
+
+        if midi_pitch > 0:
+            in_note = True
+            note_start = t
+            note_pitch = midi_pitch
+            note_frames = 1
+            counts[pitch_tolerance] = 1
 
-    if current_note is not None:
-        current_note['end'] = times[-1]
-        current_note['pitch'] = int(np.median(current_note['pitches']))
-        if current_note['end'] - current_note['start'] >= min_note_duration:
-            notes.append(current_note)
+    return starts, ends, pitches, count
 
-    return notes
+
+def segment_notes(
+    times: np.ndarray,
+    midi_pitches: np.ndarray,
+    min_note_duration: float = 0.05,
+    pitch_tolerance: int = 1,
+) -> SegmentedNotes:
+    """Segment a per-frame MIDI pitch track (see hz_to_midi_array) into discrete notes."""
+    if len(times) == 0:
+        return SegmentedNotes(np.empty(0, np.int16), np.empty(0), np.empty(0))
+
+    starts, ends, pitches, count = _segment_notes_kernel(
+        np.ascontiguousarray(times, dtype=np.float64),
+        np.ascontiguousarray(midi_pitches, dtype=np.int16),
+        float(min_note_duration),
+        int(pitch_tolerance),
+    )
+
+    return SegmentedNotes(pitches[:count].astype(np.int16), starts[:count], ends[:count])
 
 
 def notes_to_midi(
-    notes: list[dict],
+    notes: SegmentedNotes,
     output_path: str,
     bpm: float = 120.0,
     instrument_name: str = 'Lead',
@@ -317,14 +467,11 @@ def notes_to_midi(
     midi = pretty_midi.PrettyMIDI(initial_tempo=bpm)
     instrument = pretty_midi.Instrument(program=80, name=instrument_name)
 
-    for note_data in notes:
-        note = pretty_midi.Note(
-            velocity=velocity,
-            pitch=note_data['pitch'],
-            start=note_data['start'],
-            end=note_data['end'],
-        )
-        instrument.notes.append(note)
+    note = pretty_midi.Note
+    instrument.notes = [
+        note(velocity, pitch, start, end)
+        for pitch, start, end in zip(notes.pitches.tolist(), notes.starts.tolist(), notes.ends.tolist())
+    ]
 
     midi.instruments.append(instrument)
     midi.write(output_path)
@@ -355,21 +502,22 @@ def convert_with_librosa(
         bpm = detect_bpm(y, sr)
 
     times, frequencies, voiced = detect_pitch_pyin(y, sr, fmin=fmin, fmax=fmax)
-    notes = segment_notes(times, frequencies, voiced, min_note_duration=min_note_duration)
+    midi_pitches = hz_to_midi_array(frequencies, voiced)
+    notes = segment_notes(times, midi_pitches, min_note_duration=min_note_duration)
 
     if not notes:
         raise ValueError("No notes detected in audio")
 
     midi = notes_to_midi(notes, output_path, bpm=bpm)
-    duration = notes[-1]['end'] - notes[0]['start'] if notes else 0
+    duration = float(notes.ends[-1] - notes.starts[0])
 
     return {
         'notes': len(notes),
         'duration': duration,
         'bpm': bpm,
         'pitch_range': (
-            min(n['pitch'] for n in notes),
-            max(n['pitch'] for n in notes)
+            int(notes.pitches.min()),
+            int(notes.pitches.max())
         ),
         'method': 'librosa_pyin',
     }
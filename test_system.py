@@ -58,16 +58,16 @@ except Exception as e:
 print("\n[4/5] Testing Chorus Encore API...")
 try:
     from chorus_api import ChorusAPI, SearchParams, Instrument as ChorusInstrument
-    api = ChorusAPI()
-    print(f"   [OK] API client initialized")
-    print(f"   [OK] Base URL: {api.BASE_URL}")
-
-    # Try a small search
-    print("   [WAIT] Testing search (this may take a moment)...")
-    params = SearchParams(query="test", per_page=1)
-    result = api.search(params)
-    print(f"   [OK] Search successful!")
-    print(f"   [OK] Found {result.total_found:,} total charts in database")
+    with ChorusAPI() as api:
+        print(f"   [OK] API client initialized")
+        print(f"   [OK] Base URL: {api.BASE_URL}")
+
+        # Try a small search
+        print("   [WAIT] Testing search (this may take a moment)...")
+        params = SearchParams(query="test", per_page=1)
+        result = api.search(params)
+        print(f"   [OK] Search successful!")
+        print(f"   [OK] Found {result.total_found:,} total charts in database")
 
 except Exception as e:
     print(f"   [ERROR] {e}")